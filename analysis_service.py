@@ -4,14 +4,128 @@ Analysis Service
 Handles all communication with the backend API for analysis history and retrieval.
 """
 
+import orjson
 import requests
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
-from datetime import datetime
-from config import API_BASE_URL, API_TIMEOUT, API_ENDPOINTS
+import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from operator import itemgetter
+from config import API_BASE_URL, API_TIMEOUT, IMAGE_TIMEOUT, API_ENDPOINTS
+
+
+# Shared read-only fallback for missing nested objects in API responses
+_EMPTY: Dict[str, Any] = {}
+
+# Retry transient gateway errors on idempotent GETs with exponential backoff
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(['GET']),
+    raise_on_status=False  # Return the final response so API error details still surface
+)
+
+# Upper bound on concurrent per-lesion requests
+_MAX_FETCH_WORKERS = 8
+
+# Shared HTTP session so repeated calls to the backend reuse keep-alive connections
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=_RETRY)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+
+def get_session() -> requests.Session:
+    """
+    Get the shared pooled HTTP session used by AnalysisService
+
+    Returns:
+        Module-level requests.Session instance
+    """
+    return _SESSION
+
+
+def _parse_json(response: requests.Response) -> Any:
+    """
+    Decode a JSON response body with orjson
+
+    Raises:
+        requests.exceptions.JSONDecodeError: If the body is not valid JSON (as response.json() would)
+    """
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        # Keep it a RequestException so callers' connection-error handling still applies
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+
+
+def _raise_for(error: requests.exceptions.HTTPError, prefix: str, not_found_ok: bool = True) -> None:
+    """
+    Re-raise an HTTP error with the backend's error detail
+
+    Args:
+        error: HTTPError raised by raise_for_status
+        prefix: Message prefix for the raised exception
+        not_found_ok: Return None instead of raising on 404
+
+    Raises:
+        Exception: For every error except an allowed 404
+    """
+    response = error.response
+    if response is None:
+        raise Exception(f"{prefix}: {str(error)}")
+    if not_found_ok and response.status_code == 404:
+        return None
+
+    error_detail = str(error)
+    # Only JSON bodies are inspected; HTML error pages are never parsed
+    if response.headers.get('content-type', '').startswith('application/json'):
+        try:
+            parsed = orjson.loads(response.content)
+            error_detail = parsed.get('detail', error_detail)
+        except:
+            pass
+    raise Exception(f"{prefix}: {error_detail}")
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_all_patients(url: str, timeout: int, _session: requests.Session) -> List[Dict[str, Any]]:
+    """Fetch the patient list (cached for 60 seconds, errors are not cached)"""
+    response = _session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return _parse_json(response)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_feature_display_names(url: str, timeout: int, _session: requests.Session) -> Dict[str, str]:
+    """Fetch the feature name mapping (cached for 1 hour, errors are not cached)"""
+    response = _session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return _parse_json(response)
+
 
+# Analysis images never change once stored, so they can be kept for an hour; the cache
+# stays in memory only (patient photos are never written to the server's disk)
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _fetch_analysis_image(url: str, timeout: int, _session: requests.Session) -> Optional[bytes]:
+    """Download an analysis image (cached in memory for 1 hour, None if the analysis has no image)"""
+    with _session.get(url, stream=True, timeout=timeout) as response:
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.raw.read(decode_content=True)
+
+
+def clear_patients_cache():
+    """Invalidate the cached patient list (call after creating a patient)"""
+    _fetch_all_patients.clear()
 
-@dataclass
+
+@dataclass(slots=True)
 class AnalysisCase:
     """Data class for analysis case information"""
     _id: str
@@ -31,31 +145,110 @@ class AnalysisCase:
     shap_prediction: Optional[float] = None  # SHAP prediction value
     shap_base_value: Optional[float] = None  # SHAP base value
     extracted_features: Optional[List[Dict[str, Any]]] = None  # Extracted features from CV model
+    _capture_dt: Optional[datetime] = field(default=None, repr=False, compare=False)  # Parsed capture_date
+
+    def __post_init__(self):
+        if self._capture_dt is None:
+            self._capture_dt = _parse_capture_date(self.capture_date)
 
     def __str__(self):
         return f"{self.analysis_id} - {self.capture_date} - Size: {self.lesion_size_mm}mm"
 
+    @classmethod
+    def from_api(cls, item: Dict[str, Any], capture_dt: Optional[datetime] = None) -> "AnalysisCase":
+        """
+        Build an AnalysisCase from one item of the lesion analyses API response
+
+        Args:
+            item: Analysis document as returned by the backend
+            capture_dt: Pre-parsed capture date (parsed from the item if omitted)
+
+        Returns:
+            AnalysisCase instance
+        """
+        get = item.get
+        clinical_get = (get('clinical_data') or _EMPTY).get
+        model_outputs_get = (get('model_outputs') or _EMPTY).get
+        temporal_get = (get('temporal_data') or _EMPTY).get
+        image_get = (get('image') or _EMPTY).get
+        shap_get = (get('shap_analysis') or _EMPTY).get
+
+        created_at = get('created_at')
+        return cls(
+            _id=get('_id'),
+            analysis_id=get('analysis_id'),
+            patient_id=get('patient_id'),
+            lesion_id=get('lesion_id'),
+            created_at=created_at,
+            capture_date=temporal_get('capture_date', created_at),
+            days_since_first_observation=temporal_get('days_since_first_observation', 0),
+            age_at_capture=clinical_get('age_at_capture', 0),
+            lesion_size_mm=clinical_get('lesion_size_mm', 0.0),
+            model_a_probability=(model_outputs_get('image_only_model') or _EMPTY).get('malignant_probability', 0.0),
+            model_c_probability=(model_outputs_get('clinical_ml_model') or _EMPTY).get('malignant_probability', 0.0),
+            image_filename=image_get('filename'),
+            image_path=image_get('path'),
+            shap_top_features=shap_get('features', []),
+            shap_prediction=shap_get('prediction'),
+            shap_base_value=shap_get('base_value'),
+            extracted_features=model_outputs_get('extracted_features', []),
+            _capture_dt=capture_dt
+        )
+
     @property
     def capture_datetime(self) -> datetime:
-        """Parse capture_date to datetime object"""
-        try:
-            return datetime.fromisoformat(self.capture_date.replace('Z', '+00:00'))
-        except:
-            return datetime.now()
+        """capture_date as a datetime object (parsed once at construction)"""
+        return self._capture_dt
+
+
+def _parse_capture_date(capture_date: str, now: Optional[datetime] = None) -> datetime:
+    """Parse an ISO capture date, always timezone-aware (offset kept, naive taken as UTC, now if malformed)"""
+    try:
+        parsed = datetime.fromisoformat(capture_date.replace('Z', '+00:00'))
+    except:
+        return now or datetime.now(timezone.utc)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def _parse_capture_dates(capture_dates: List[str]) -> List[datetime]:
+    """Parse many ISO capture dates (malformed ones share a single fallback timestamp)"""
+    now = datetime.now(timezone.utc)
+    return [_parse_capture_date(capture_date, now) for capture_date in capture_dates]
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_lesion_analyses_bulk(
+    base_url: str,
+    lesion_ids: Tuple[str, ...],
+    _service: "AnalysisService"
+) -> Dict[str, List[AnalysisCase]]:
+    """Fetch analyses for several lesions concurrently (cached for 5 minutes)"""
+    # No more threads than lesions; the cap stays below the adapter's pool size
+    # so every concurrent GET gets its own keep-alive connection
+    with ThreadPoolExecutor(max_workers=min(_MAX_FETCH_WORKERS, len(lesion_ids))) as executor:
+        results = executor.map(_service.get_lesion_analyses, lesion_ids)
+        return dict(zip(lesion_ids, results))
+
+
+def clear_lesion_analyses_cache():
+    """Invalidate cached lesion analyses (call after storing a new analysis)"""
+    _fetch_lesion_analyses_bulk.clear()
 
 
 class AnalysisService:
     """Service to interact with Analysis APIs"""
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, session: requests.Session = None):
         """
         Initialize the service
 
         Args:
             base_url: Base URL of the backend API (defaults to config.API_BASE_URL)
+            session: HTTP session to use (defaults to the shared pooled session)
         """
         self.base_url = (base_url or API_BASE_URL).rstrip('/')
         self.timeout = API_TIMEOUT
+        self.session = session or get_session()
 
     def get_lesion_analyses(self, lesion_id: str) -> List[AnalysisCase]:
         """
@@ -73,58 +266,76 @@ class AnalysisService:
         url = f"{self.base_url}{API_ENDPOINTS['lesion_analyses'].format(lesion_id=lesion_id)}"
 
         try:
-            response = requests.get(url, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
 
-            data = response.json()
-            analyses = []
-
-            for item in data:
-                # Parse the response structure
-                clinical_data = item.get('clinical_data', {})
-                model_outputs = item.get('model_outputs', {})
-                temporal_data = item.get('temporal_data', {})
-                image_data = item.get('image', {})
-                shap_data = item.get('shap_analysis', {})
-
-                analysis = AnalysisCase(
-                    _id=item.get('_id'),
-                    analysis_id=item.get('analysis_id'),
-                    patient_id=item.get('patient_id'),
-                    lesion_id=item.get('lesion_id'),
-                    created_at=item.get('created_at'),
-                    capture_date=temporal_data.get('capture_date', item.get('created_at')),
-                    days_since_first_observation=temporal_data.get('days_since_first_observation', 0),
-                    age_at_capture=clinical_data.get('age_at_capture', 0),
-                    lesion_size_mm=clinical_data.get('lesion_size_mm', 0.0),
-                    model_a_probability=model_outputs.get('image_only_model', {}).get('malignant_probability', 0.0),
-                    model_c_probability=model_outputs.get('clinical_ml_model', {}).get('malignant_probability', 0.0),
-                    image_filename=image_data.get('filename'),
-                    image_path=image_data.get('path'),
-                    shap_top_features=shap_data.get('features', []),  # Correct field name
-                    shap_prediction=shap_data.get('prediction'),
-                    shap_base_value=shap_data.get('base_value'),
-                    extracted_features=model_outputs.get('extracted_features', [])
-                )
-                analyses.append(analysis)
-
-            # Sort by capture_date (oldest first)
-            analyses.sort(key=lambda x: x.capture_datetime)
+            data = _parse_json(response)
+
+            # Parse all capture dates up front; they double as the sort keys
+            capture_dates = [
+                (item.get('temporal_data') or _EMPTY).get('capture_date', item.get('created_at'))
+                for item in data
+            ]
+            capture_dts = _parse_capture_dates(capture_dates) if data else []
+
+            keyed = list(zip(capture_dts, data))
+
+            # Sort by capture_date (oldest first) on the precomputed keys; the
+            # backend normally returns them in order, in which case skip the sort
+            if any(later < earlier for earlier, later in zip(capture_dts, capture_dts[1:])):
+                keyed.sort(key=itemgetter(0))
+
+            analyses = [AnalysisCase.from_api(item, capture_dt) for capture_dt, item in keyed]
 
             return analyses
 
         except requests.exceptions.HTTPError as e:
-            if response.status_code == 404:
-                return []  # No analyses found for this lesion
-            try:
-                error_detail = response.json().get('detail', str(e))
-            except:
-                error_detail = str(e)
-            raise Exception(f"Failed to get lesion analyses: {error_detail}")
+            _raise_for(e, "Failed to get lesion analyses")
+            return []  # No analyses found for this lesion
 
         except requests.exceptions.RequestException as e:
             raise Exception(f"Connection error: {str(e)}")
 
+    def get_lesion_analyses_bulk(self, lesion_ids: List[str]) -> Dict[str, List[AnalysisCase]]:
+        """
+        Get analyses for several lesions using concurrent requests
+
+        Args:
+            lesion_ids: List of lesion IDs
+
+        Returns:
+            Dictionary mapping lesion_id to its list of AnalysisCase objects
+
+        Raises:
+            Exception: If any API call fails
+        """
+        if not lesion_ids:
+            return {}
+
+        return _fetch_lesion_analyses_bulk(self.base_url, tuple(sorted(set(lesion_ids))), self)
+
+    def get_analysis_summary(self, lesion_ids: List[str]) -> Dict[str, Any]:
+        """
+        Summarize the analyses of several lesions (e.g. all lesions of a patient)
+
+        Args:
+            lesion_ids: List of lesion IDs
+
+        Returns:
+            Dictionary with total_analyses, lesion_counts (per lesion_id) and
+            analyses_by_lesion (the fetched AnalysisCase lists)
+
+        Raises:
+            Exception: If any API call fails
+        """
+        analyses_by_lesion = self.get_lesion_analyses_bulk(lesion_ids)
+        lesion_counts = {lesion_id: len(analyses) for lesion_id, analyses in analyses_by_lesion.items()}
+        return {
+            'total_analyses': sum(lesion_counts.values()),
+            'lesion_counts': lesion_counts,
+            'analyses_by_lesion': analyses_by_lesion
+        }
+
     def get_all_patients(self) -> List[Dict[str, Any]]:
         """
         Get all patients
@@ -138,16 +349,10 @@ class AnalysisService:
         url = f"{self.base_url}{API_ENDPOINTS['patients']}"
 
         try:
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
+            return _fetch_all_patients(url, self.timeout, self.session)
 
         except requests.exceptions.HTTPError as e:
-            try:
-                error_detail = response.json().get('detail', str(e))
-            except:
-                error_detail = str(e)
-            raise Exception(f"Failed to get patients: {error_detail}")
+            _raise_for(e, "Failed to get patients", not_found_ok=False)
 
         except requests.exceptions.RequestException as e:
             raise Exception(f"Connection error: {str(e)}")
@@ -167,6 +372,35 @@ class AnalysisService:
 
         return f"{self.base_url}{API_ENDPOINTS['analysis_image'].format(analysis_id=analysis_id)}"
 
+    def fetch_analysis_image(self, analysis_id: str) -> Optional[bytes]:
+        """
+        Download the image of an analysis (cached per analysis)
+
+        Args:
+            analysis_id: Analysis ID
+
+        Returns:
+            Raw image bytes, or None if no image is available
+
+        Raises:
+            Exception: If API call fails
+        """
+        url = self.get_analysis_image_url(analysis_id)
+        if not url:
+            return None
+
+        try:
+            return _fetch_analysis_image(url, IMAGE_TIMEOUT, self.session)
+
+        except requests.exceptions.HTTPError as e:
+            raise Exception(f"Image not accessible (HTTP {e.response.status_code})")
+
+        except requests.exceptions.Timeout:
+            raise Exception("Image load timeout. Backend may be slow.")
+
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Connection error: {str(e)}")
+
     def get_feature_display_names(self) -> Dict[str, str]:
         """
         Get feature name mappings from backend
@@ -180,26 +414,20 @@ class AnalysisService:
         url = f"{self.base_url}{API_ENDPOINTS['feature_names']}"
 
         try:
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
+            return _fetch_feature_display_names(url, self.timeout, self.session)
 
         except requests.exceptions.HTTPError as e:
             # If endpoint doesn't exist, return empty dict
-            if response.status_code == 404:
-                return {}
-            try:
-                error_detail = response.json().get('detail', str(e))
-            except:
-                error_detail = str(e)
-            raise Exception(f"Failed to get feature names: {error_detail}")
+            _raise_for(e, "Failed to get feature names")
+            return {}
 
         except requests.exceptions.RequestException as e:
             # On connection error, return empty dict (graceful degradation)
             return {}
 
 
-# Utility function for easy import
+# Utility function for easy import (one instance per process, shared across reruns and sessions)
+@st.cache_resource(show_spinner=False)
 def create_analysis_service(base_url: str = None) -> AnalysisService:
     """
     Factory function to create an AnalysisService instance
@@ -208,6 +436,6 @@ def create_analysis_service(base_url: str = None) -> AnalysisService:
         base_url: Base URL of the backend API (defaults to config.API_BASE_URL)
 
     Returns:
-        Configured AnalysisService instance
+        Configured AnalysisService instance (cached singleton per base_url)
     """
     return AnalysisService(base_url)
@@ -0,0 +1,275 @@
+"""
+Shared Styles - Global CSS for the app theme and the recurring message/card classes
+"""
+
+import streamlit as st
+
+
+APP_CSS = """
+    <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Material+Symbols+Rounded:opsz,wght,FILL,GRAD@20..48,100..700,0..1,-50..200" />
+
+    <style>
+        /* Sidebar styling - Medical blue-green theme */
+        [data-testid="stSidebar"] {
+            background: linear-gradient(180deg, #0d4d5e 0%, #115e70 100%);
+        }
+
+        [data-testid="stSidebar"] * {
+            color: white !important;
+        }
+
+        [data-testid="stSidebar"] .stMarkdown {
+            color: white !important;
+        }
+
+        /* Page background - Light clinical theme */
+        .main {
+            background-color: #f0f7f9;
+        }
+
+        .block-container {
+            background-color: #f0f7f9;
+        }
+
+        /* Button styling in sidebar */
+        [data-testid="stSidebar"] button {
+            background-color: rgba(255, 255, 255, 0.15) !important;
+            border: 1px solid rgba(255, 255, 255, 0.3) !important;
+            color: white !important;
+        }
+
+        [data-testid="stSidebar"] button:hover {
+            background-color: rgba(255, 255, 255, 0.25) !important;
+            border-color: rgba(255, 255, 255, 0.5) !important;
+        }
+
+        [data-testid="stSidebar"] button[kind="primary"] {
+            background-color: rgba(255, 255, 255, 0.35) !important;
+            font-weight: 600 !important;
+            border: 2px solid rgba(255, 255, 255, 0.6) !important;
+        }
+
+        [data-testid="stSidebar"] button p {
+            color: white !important;
+        }
+
+        /* Headings on main page - Medical theme colors */
+        .main h1 {
+            color: #0d4d5e !important;
+        }
+
+        .main h2 {
+            color: #115e70 !important;
+        }
+
+        .main h3 {
+            color: #15758a !important;
+        }
+
+        /* Material icon inline with text (used together with .material-symbols-rounded) */
+        .mi {
+            font-size: 1.2rem;
+            vertical-align: middle;
+            margin-right: 0.5rem;
+        }
+
+        /* Info / success / error messages */
+        .msg {
+            border-left: 4px solid var(--msg-border);
+            background-color: var(--msg-bg);
+            border-radius: 8px;
+            padding: 1rem;
+            margin: 1rem 0;
+        }
+
+        .msg p {
+            color: var(--msg-fg);
+            margin: 0;
+            font-size: 0.9rem;
+        }
+
+        .msg--info { --msg-bg: #e0f2fe; --msg-border: #0284c7; --msg-fg: #0c4a6e; }
+        .msg--success { --msg-bg: #f0fdf4; --msg-border: #22c55e; --msg-fg: #15803d; }
+        .msg--error { --msg-bg: #fef2f2; --msg-border: #ef4444; --msg-fg: #991b1b; }
+        .msg--warning { --msg-bg: #fef3c7; --msg-border: #f59e0b; --msg-fg: #92400e; }
+
+        /* Two-column card grid */
+        .card-grid-2 {
+            display: grid;
+            grid-template-columns: repeat(2, 1fr);
+            column-gap: 1rem;
+        }
+
+        /* Search results (patient/lesion pickers) */
+        .result-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(16rem, 1fr));
+            gap: 0.5rem;
+            margin: 0.5rem 0 1rem 0;
+        }
+
+        .result-card {
+            background-color: #f9fafb;
+            border-radius: 8px;
+            padding: 0.75rem 1rem;
+            font-size: 0.9rem;
+            line-height: 1.5;
+        }
+
+        /* Read-only field summary (selected patient/lesion) */
+        .field-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(10rem, 1fr));
+            gap: 1rem;
+            margin: 0.5rem 0 1rem 0;
+        }
+
+        .field-grid div {
+            background-color: #f9fafb;
+            border-radius: 8px;
+            padding: 0.5rem 0.75rem;
+            font-size: 0.9rem;
+        }
+
+        .field-grid strong {
+            display: block;
+            color: #6b7280;
+            font-size: 0.8rem;
+            font-weight: 600;
+        }
+
+        /* Light teal cards (About page benefits and technical stack) */
+        .benefit-card {
+            background: linear-gradient(135deg, #e0f2f7 0%, #b3e5f0 100%);
+            border-left: 4px solid #2d8a9b;
+            border-radius: 8px;
+            padding: 1rem;
+            margin: 0.5rem 0;
+        }
+
+        .stack-card {
+            background: linear-gradient(135deg, #e0f2f7 0%, #b3e5f0 100%);
+            border-radius: 12px;
+            padding: 1.5rem;
+            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+        }
+
+        .stack-card h4 {
+            color: #0a3940;
+            margin-top: 0;
+            text-align: center;
+        }
+
+        .benefit-card p, .stack-card p {
+            color: #0a3940;
+            margin: 0.5rem 0;
+            font-size: 0.9rem;
+        }
+
+        .benefit-card p {
+            margin: 0;
+        }
+
+        /* Patient card and lesion headers (History page) */
+        .profile-card {
+            background: linear-gradient(135deg, #a8d5dd 0%, #7eb8c4 100%);
+            border-radius: 12px;
+            padding: 1.5rem;
+            color: #0a3940;
+            margin: 1rem 0;
+            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+        }
+
+        .profile-card--patient {
+            margin: 0 0 1.5rem 0;
+        }
+
+        .profile-card h2, .profile-card h3 {
+            color: #0a3940;
+            margin: 0 0 1rem 0;
+        }
+
+        .profile-card h3 {
+            font-weight: 600;
+        }
+
+        .profile-card__grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
+            gap: 1rem;
+        }
+
+        .profile-card--patient .profile-card__grid {
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+        }
+
+        .profile-card__grid p {
+            margin: 0;
+        }
+
+        .profile-card__label {
+            opacity: 0.9;
+            font-size: 0.9rem;
+        }
+
+        .profile-card__value {
+            font-weight: 600;
+            font-size: 1.1rem;
+        }
+
+        /* Model cards (About page) */
+        .model-card {
+            background: linear-gradient(135deg, var(--mc-c1) 0%, var(--mc-c2) 100%);
+            border-radius: 12px;
+            padding: 1.5rem;
+            height: 100%;
+            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+            color: var(--mc-text);
+        }
+
+        .model-card h5 {
+            color: var(--mc-header);
+            margin: 0.5rem 0;
+            text-align: center;
+        }
+
+        .model-card hr {
+            border: none;
+            border-top: 1px solid var(--mc-rule);
+            margin: 1rem 0;
+        }
+
+        .model-card p {
+            color: var(--mc-text);
+            font-size: 0.85rem;
+            margin: 0.3rem 0;
+        }
+
+        .model-card .model-card__subtitle {
+            text-align: center;
+            line-height: 1.4;
+            margin: 0.5rem 0;
+        }
+
+        .model-card .model-card__body {
+            font-size: 0.9rem;
+            line-height: 1.6;
+            margin: 0.5rem 0;
+        }
+
+        .model-card--blue { --mc-c1: #dbeafe; --mc-c2: #bfdbfe; --mc-header: #1e40af; --mc-rule: #93c5fd; --mc-text: #1e3a8a; }
+        .model-card--purple { --mc-c1: #e9d5ff; --mc-c2: #d8b4fe; --mc-header: #7c3aed; --mc-rule: #c084fc; --mc-text: #6b21a8; }
+        .model-card--green { --mc-c1: #d1fae5; --mc-c2: #a7f3d0; --mc-header: #15803d; --mc-rule: #6ee7b7; --mc-text: #166534; }
+    </style>
+"""
+
+
+def inject_css():
+    """
+    Emit the global stylesheet
+
+    Must be called on every run: Streamlit removes elements that are not
+    re-emitted during a rerun, so a once-per-session injection would drop
+    the styles after the first interaction.
+    """
+    st.markdown(APP_CSS, unsafe_allow_html=True)
@@ -13,87 +13,109 @@ Workflow:
 4. Results Display
 """
 
+import html
+import time
+from io import BytesIO
 import streamlit as st
-from PIL import Image
 from datetime import datetime
-import sys
-from pathlib import Path
-
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# main.py is run from the repository root, which Streamlit already puts on
+# sys.path, so top-level modules are imported directly
 from config import (
-    SUPPORTED_IMAGE_TYPES, ANATOMICAL_LOCATIONS, SEX_OPTIONS,
+    SUPPORTED_IMAGE_TYPES, ANATOMICAL_LOCATIONS, ANATOMICAL_LOCATION_KEYS, SEX_OPTIONS,
     DATE_FORMAT, DIAMETER_MIN, DIAMETER_MAX, DIAMETER_DEFAULT, DIAMETER_STEP,
     FOOTER_HTML, ERROR_MESSAGES, API_BASE_URL, load_image_base64
 )
 from utils.id_generator import generate_patient_id, generate_lesion_id
 from utils.validators import (
-    validate_patient_name, validate_date_of_birth, validate_sex,
-    validate_lesion_location, validate_initial_lesion_size,
+    validate_patient, validate_lesion,
     validate_current_lesion_size, calculate_age_from_dob
 )
-from patient_lesion_service import create_patient_lesion_service
-from prediction_service import create_service
+from patient_lesion_service import (
+    create_patient_lesion_service, search_patients_cached, get_lesions_by_patient_cached,
+    clear_patient_search_cache, clear_lesions_cache
+)
+from analysis_service import clear_patients_cache, clear_lesion_analyses_cache
+
+
+# Styled message templates (styles live in app_pages/_styles.py; only the body changes)
+_MESSAGE_HTML = (
+    '<div class="msg msg--{kind}"><p>'
+    '<span class="material-symbols-rounded mi">{icon}</span>{{msg}}</p></div>'
+)
+_INFO_HTML = _MESSAGE_HTML.format(kind="info", icon="info")
+_SUCCESS_HTML = _MESSAGE_HTML.format(kind="success", icon="check_circle")
+_ERROR_HTML = _MESSAGE_HTML.format(kind="error", icon="gpp_bad")
+
+
+def _message_html(template: str, lines) -> str:
+    """Escape each line and fill them (joined by <br>) into a message template"""
+    return template.format(msg="<br>".join(map(html.escape, lines)))
+
+
+def _render_message(template: str, lines):
+    """Render a styled message"""
+    st.markdown(_message_html(template, lines), unsafe_allow_html=True)
+
+
+class FlashQueue:
+    """Collects styled messages and renders them together as a single element"""
+
+    def __init__(self):
+        self.messages = []
+
+    def info(self, *lines: str):
+        self.messages.append((_INFO_HTML, lines))
+
+    def success(self, *lines: str):
+        self.messages.append((_SUCCESS_HTML, lines))
 
-# Import display functions from backup main
-sys.path.insert(0, str(Path(__file__).parent.parent))
-import main_backup as display_functions
+    def error(self, *lines: str):
+        self.messages.append((_ERROR_HTML, lines))
+
+    def flush(self):
+        """Render all queued messages in one st.markdown call and empty the queue"""
+        if self.messages:
+            st.markdown(
+                "".join(_message_html(template, lines) for template, lines in self.messages),
+                unsafe_allow_html=True
+            )
+            self.messages = []
+
+
+def _result_grid_html(rows) -> str:
+    """Build one HTML grid of result cards from (title, *detail_lines) tuples (escaped)"""
+    cards = "".join(
+        f'<div class="result-card"><strong>{html.escape(title)}</strong><br>'
+        f'{"<br>".join(map(html.escape, details))}</div>'
+        for title, *details in rows
+    )
+    return f'<div class="result-grid">{cards}</div>'
+
+
+def _field_grid_html(fields) -> str:
+    """Build one read-only HTML summary from (label, value) pairs (escaped)"""
+    cells = "".join(
+        f'<div><strong>{html.escape(label)}</strong>{html.escape(str(value))}</div>'
+        for label, value in fields
+    )
+    return f'<div class="field-grid">{cells}</div>'
 
 
 # Helper functions for styled messages
-def show_info_message(message: str):
-    """Display info message with Material Icon"""
-    st.markdown(f"""
-        <div style="
-            background-color: #e0f2fe;
-            border-left: 4px solid #0284c7;
-            border-radius: 8px;
-            padding: 1rem;
-            margin: 1rem 0;
-        ">
-            <p style="color: #0c4a6e; margin: 0; font-size: 0.9rem;">
-                <span class="material-symbols-rounded" style="font-size: 1.2rem; vertical-align: middle; margin-right: 0.5rem;">info</span>
-                {message}
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
-
-
-def show_success_message(message: str):
-    """Display success message with Material Icon"""
-    st.markdown(f"""
-        <div style="
-            background-color: #f0fdf4;
-            border-left: 4px solid #22c55e;
-            border-radius: 8px;
-            padding: 1rem;
-            margin: 1rem 0;
-        ">
-            <p style="color: #15803d; margin: 0; font-size: 0.9rem;">
-                <span class="material-symbols-rounded" style="font-size: 1.2rem; vertical-align: middle; margin-right: 0.5rem;">check_circle</span>
-                {message}
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
-
-
-def show_error_message(message: str):
-    """Display error message with Material Icon"""
-    st.markdown(f"""
-        <div style="
-            background-color: #fef2f2;
-            border-left: 4px solid #ef4444;
-            border-radius: 8px;
-            padding: 1rem;
-            margin: 1rem 0;
-        ">
-            <p style="color: #991b1b; margin: 0; font-size: 0.9rem;">
-                <span class="material-symbols-rounded" style="font-size: 1.2rem; vertical-align: middle; margin-right: 0.5rem;">gpp_bad</span>
-                {message}
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
+def show_info_message(*lines: str):
+    """Display info message with Material Icon (one line per argument)"""
+    _render_message(_INFO_HTML, lines)
+
+
+def show_success_message(*lines: str):
+    """Display success message with Material Icon (one line per argument)"""
+    _render_message(_SUCCESS_HTML, lines)
+
+
+def show_error_message(*lines: str):
+    """Display error message with Material Icon (one line per argument)"""
+    _render_message(_ERROR_HTML, lines)
 
 
 def render():
@@ -124,60 +146,54 @@ def render():
         st.markdown("---")
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            if st.button("New Analysis", use_container_width=True, type="secondary", key="new_analysis_button"):
-                reset_all_state()
-                st.rerun()
+            st.button(
+                "New Analysis", use_container_width=True, type="secondary", key="new_analysis_button",
+                on_click=reset_all_state
+            )
 
     # Footer
     st.markdown("---")
     st.markdown(FOOTER_HTML, unsafe_allow_html=True)
 
 
-def initialize_session_state():
-    """Initialize all session state variables"""
+# Seconds a session reuses its last patient search results
+_SEARCH_RESULTS_TTL = 30
 
+# Default values for the analysis workflow session state
+_SESSION_DEFAULTS = {
     # Patient state flags
-    if 'patient_data_ready' not in st.session_state:
-        st.session_state.patient_data_ready = False
-    if 'patient_is_new' not in st.session_state:
-        st.session_state.patient_is_new = True  # Track if patient is new or existing
-
+    'patient_data_ready': False,
+    'patient_is_new': True,  # Track if patient is new or existing
     # Lesion state flags
-    if 'lesion_data_ready' not in st.session_state:
-        st.session_state.lesion_data_ready = False
-    if 'lesion_is_new' not in st.session_state:
-        st.session_state.lesion_is_new = True  # Track if lesion is new or existing
-
+    'lesion_data_ready': False,
+    'lesion_is_new': True,  # Track if lesion is new or existing
     # Analysis state
-    if 'analysis_complete' not in st.session_state:
-        st.session_state.analysis_complete = False
-
+    'analysis_complete': False,
     # Patient data (temporary storage - NOT in DB yet)
-    if 'patient_data' not in st.session_state:
-        st.session_state.patient_data = None  # Dict: {full_name, date_of_birth, sex, patient_id (if existing)}
-
+    'patient_data': None,  # Dict: {full_name, date_of_birth, sex, patient_id (if existing)}
     # Lesion data (temporary storage - NOT in DB yet)
-    if 'lesion_data' not in st.session_state:
-        st.session_state.lesion_data = None  # Dict: {location, initial_size_mm, lesion_id (if existing)}
-
+    'lesion_data': None,  # Dict: {location, initial_size_mm, lesion_id (if existing)}
     # Analysis results
-    if 'last_response' not in st.session_state:
-        st.session_state.last_response = None
-    if 'show_shap' not in st.session_state:
-        st.session_state.show_shap = False
+    'last_response': None,
+    'show_shap': False,
+}
+
+
+def initialize_session_state():
+    """Initialize all session state variables"""
+    missing = {key: value for key, value in _SESSION_DEFAULTS.items() if key not in st.session_state}
+    if missing:
+        st.session_state.update(missing)
+
+
+def reset_state(**values):
+    """Set several session state keys in a single update"""
+    st.session_state.update(values)
 
 
 def reset_all_state():
     """Reset all session state to start fresh"""
-    st.session_state.patient_data_ready = False
-    st.session_state.patient_is_new = True
-    st.session_state.lesion_data_ready = False
-    st.session_state.lesion_is_new = True
-    st.session_state.analysis_complete = False
-    st.session_state.patient_data = None
-    st.session_state.lesion_data = None
-    st.session_state.last_response = None
-    st.session_state.show_shap = False
+    reset_state(**_SESSION_DEFAULTS)
 
 
 # =============================================================================
@@ -243,21 +259,10 @@ def render_new_patient_form():
 
         if submitted:
             # Validate inputs
-            valid_name, name_error = validate_patient_name(full_name)
-            valid_dob, dob_error = validate_date_of_birth(date_of_birth)
-            valid_sex, sex_error = validate_sex(sex)
-
-            errors = []
-            if not valid_name:
-                errors.append(name_error)
-            if not valid_dob:
-                errors.append(dob_error)
-            if not valid_sex:
-                errors.append(sex_error)
+            errors = validate_patient(full_name, date_of_birth, sex)
 
             if errors:
-                for error in errors:
-                    show_error_message(error)
+                show_error_message(*errors)
             else:
                 # Store patient data in session state (NOT in DB)
                 st.session_state.patient_data = {
@@ -267,6 +272,8 @@ def render_new_patient_form():
                     'patient_id': None  # Will be generated during analysis
                 }
                 st.session_state.patient_data_ready = True
+                # Allocate the ID now so the Analyze click goes straight to the DB write
+                st.session_state._prealloc_patient_id = generate_patient_id()
                 st.session_state.patient_is_new = True
                 show_success_message(f"Patient data captured: {full_name}")
                 st.rerun()
@@ -276,50 +283,89 @@ def render_search_patient():
     """Render patient search interface"""
     st.markdown("### Search Existing Patient")
 
-    search_term = st.text_input(
-        "Search by name",
-        placeholder="Type at least 2 characters...",
-        help="Search for patients by name"
-    )
+    # Query the backend once per submitted search, not on every keystroke
+    with st.form("patient_search_form"):
+        search_term = st.text_input(
+            "Search by name",
+            placeholder="Type at least 2 characters...",
+            help="Search for patients by name"
+        )
+        submitted = st.form_submit_button("Search")
+
+    if submitted:
+        if len(search_term.strip()) >= 2:
+            st.session_state.last_patient_search = search_term.strip()
+        else:
+            st.session_state.last_patient_search = ""
+            show_info_message("Type at least 2 characters to search")
+
+    search_term = st.session_state.get('last_patient_search', "")
 
-    if len(search_term) >= 2:
+    if search_term:
         try:
-            service = create_patient_lesion_service()
-            patients = service.search_patients_by_name(search_term)
+            # Reuse this session's last results for unrelated reruns (short TTL)
+            cached = st.session_state.get('_patient_search_cache', {})
+            if cached.get('term') == search_term and time.monotonic() - cached.get('ts', 0) <= _SEARCH_RESULTS_TTL:
+                patients = cached['results']
+            else:
+                patients = search_patients_cached(search_term)
+                st.session_state._patient_search_cache = {
+                    'term': search_term, 'results': patients, 'ts': time.monotonic()
+                }
 
             if not patients:
                 show_info_message("No patients found matching your search")
             else:
                 st.markdown(f"Found **{len(patients)}** patient(s):")
 
-                for patient in patients:
-                    col1, col2 = st.columns([3, 1])
-
-                    with col1:
-                        st.markdown(f"""
-                            **{patient.patient_full_name}**
-                            - ID: `{patient.patient_id}`
-                            - Sex: {patient.sex.title()}
-                            - DOB: {patient.date_of_birth}
-                        """)
-
-                    with col2:
-                        if st.button("Select", key=f"select_{patient.patient_id}"):
-                            # Store EXISTING patient data
-                            st.session_state.patient_data = {
-                                'full_name': patient.patient_full_name,
-                                'date_of_birth': patient.date_of_birth,
-                                'sex': patient.sex,
-                                'patient_id': patient.patient_id  # Existing ID
-                            }
-                            st.session_state.patient_data_ready = True
-                            st.session_state.patient_is_new = False  # Existing patient
-                            st.rerun()
+                # All results in a single element; one picker instead of a button per row
+                st.markdown(_result_grid_html(
+                    (
+                        patient.patient_full_name,
+                        f"ID: {patient.patient_id}",
+                        f"Sex: {patient.sex.title()} | DOB: {patient.date_of_birth}"
+                    )
+                    for patient in patients
+                ), unsafe_allow_html=True)
+
+                selected_index = st.selectbox(
+                    "Select patient",
+                    options=range(len(patients)),
+                    format_func=lambda i: f"{patients[i].patient_full_name} ({patients[i].patient_id})",
+                    key="patient_search_choice"
+                )
+
+                st.button("Select", key="select_patient_button", on_click=_select_patient, args=(patients[selected_index],))
 
         except Exception as e:
             show_error_message(f"Search failed: {str(e)}")
 
 
+def _select_patient(patient):
+    """Button callback: use an existing patient"""
+    # Store EXISTING patient data
+    reset_state(
+        patient_data={
+            'full_name': patient.patient_full_name,
+            'date_of_birth': patient.date_of_birth,
+            'sex': patient.sex,
+            'patient_id': patient.patient_id  # Existing ID
+        },
+        patient_data_ready=True,
+        patient_is_new=False  # Existing patient
+    )
+
+
+def _change_patient():
+    """Button callback: go back to patient selection"""
+    reset_state(
+        patient_data_ready=False,
+        patient_data=None,
+        lesion_data_ready=False,  # Reset lesion too
+        lesion_data=None
+    )
+
+
 def display_selected_patient():
     """Display selected patient information (read-only)"""
     patient_data = st.session_state.patient_data
@@ -329,24 +375,14 @@ def display_selected_patient():
     else:
         show_info_message(f"Existing Patient Selected: {patient_data['full_name']} (ID: {patient_data['patient_id']})")
 
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.text_input("Full Name", value=patient_data['full_name'], disabled=True)
-
-    with col2:
-        st.text_input("Date of Birth", value=patient_data['date_of_birth'], disabled=True)
-
-    with col3:
-        st.text_input("Sex", value=patient_data['sex'].title(), disabled=True)
+    st.markdown(_field_grid_html((
+        ("Full Name", patient_data['full_name']),
+        ("Date of Birth", patient_data['date_of_birth']),
+        ("Sex", patient_data['sex'].title())
+    )), unsafe_allow_html=True)
 
     # Change patient button
-    if st.button("Change Patient", key="change_patient_button"):
-        st.session_state.patient_data_ready = False
-        st.session_state.patient_data = None
-        st.session_state.lesion_data_ready = False  # Reset lesion too
-        st.session_state.lesion_data = None
-        st.rerun()
+    st.button("Change Patient", key="change_patient_button", on_click=_change_patient)
 
 
 # =============================================================================
@@ -398,7 +434,7 @@ def render_new_lesion_form():
         # Location dropdown
         location_display = st.selectbox(
             "Lesion Location",
-            options=list(ANATOMICAL_LOCATIONS.keys()),
+            options=ANATOMICAL_LOCATION_KEYS,
             help="Select the anatomical location of the lesion"
         )
 
@@ -419,18 +455,10 @@ def render_new_lesion_form():
             api_location = ANATOMICAL_LOCATIONS[location_display]["api_value"]
 
             # Validate
-            valid_location, location_error = validate_lesion_location(api_location)
-            valid_size, size_error = validate_initial_lesion_size(initial_size)
-
-            errors = []
-            if not valid_location:
-                errors.append(location_error)
-            if not valid_size:
-                errors.append(size_error)
+            errors = validate_lesion(api_location, initial_size)
 
             if errors:
-                for error in errors:
-                    show_error_message(error)
+                show_error_message(*errors)
             else:
                 # Store lesion data in session state (NOT in DB)
                 st.session_state.lesion_data = {
@@ -440,6 +468,8 @@ def render_new_lesion_form():
                     'lesion_id': None  # Will be generated during analysis
                 }
                 st.session_state.lesion_data_ready = True
+                # Allocate the ID now so the Analyze click goes straight to the DB write
+                st.session_state._prealloc_lesion_id = generate_lesion_id(api_location)
                 st.session_state.lesion_is_new = True
                 show_success_message(f"Lesion data captured: {location_display} ({initial_size} mm)")
                 st.rerun()
@@ -452,42 +482,56 @@ def render_search_lesion():
     patient_id = st.session_state.patient_data['patient_id']
 
     try:
-        service = create_patient_lesion_service()
-        lesions = service.get_lesions_by_patient(patient_id)
+        lesions = get_lesions_by_patient_cached(patient_id)
 
         if not lesions:
             show_info_message("This patient has no lesions yet. Please create a new lesion.")
         else:
             st.markdown(f"Found **{len(lesions)}** lesion(s) for this patient:")
 
-            for lesion in lesions:
-                col1, col2 = st.columns([3, 1])
-
-                with col1:
-                    st.markdown(f"""
-                        **{lesion.lesion_id}**
-                        - Location: {lesion.lesion_location.title()}
-                        - Initial Size: {lesion.initial_size_mm} mm
-                        - Created: {lesion.created_at[:10] if lesion.created_at else 'N/A'}
-                    """)
-
-                with col2:
-                    if st.button("Select", key=f"select_{lesion.lesion_id}"):
-                        # Store EXISTING lesion data
-                        st.session_state.lesion_data = {
-                            'location': lesion.lesion_location,
-                            'location_display': lesion.lesion_location.title(),
-                            'initial_size_mm': lesion.initial_size_mm,
-                            'lesion_id': lesion.lesion_id  # Existing ID
-                        }
-                        st.session_state.lesion_data_ready = True
-                        st.session_state.lesion_is_new = False  # Existing lesion
-                        st.rerun()
+            # All results in a single element; one picker instead of a button per row
+            st.markdown(_result_grid_html(
+                (
+                    lesion.lesion_id,
+                    f"Location: {lesion.lesion_location.title()} | Initial Size: {lesion.initial_size_mm} mm",
+                    f"Created: {lesion.created_at[:10] if lesion.created_at else 'N/A'}"
+                )
+                for lesion in lesions
+            ), unsafe_allow_html=True)
+
+            selected_index = st.selectbox(
+                "Select lesion",
+                options=range(len(lesions)),
+                format_func=lambda i: f"{lesions[i].lesion_id} - {lesions[i].lesion_location.title()}",
+                key="lesion_search_choice"
+            )
+
+            st.button("Select", key="select_lesion_button", on_click=_select_lesion, args=(lesions[selected_index],))
 
     except Exception as e:
         show_error_message(f"Failed to load lesions: {str(e)}")
 
 
+def _select_lesion(lesion):
+    """Button callback: use an existing lesion"""
+    # Store EXISTING lesion data
+    reset_state(
+        lesion_data={
+            'location': lesion.lesion_location,
+            'location_display': lesion.lesion_location.title(),
+            'initial_size_mm': lesion.initial_size_mm,
+            'lesion_id': lesion.lesion_id  # Existing ID
+        },
+        lesion_data_ready=True,
+        lesion_is_new=False  # Existing lesion
+    )
+
+
+def _change_lesion():
+    """Button callback: go back to lesion selection"""
+    reset_state(lesion_data_ready=False, lesion_data=None)
+
+
 def display_selected_lesion():
     """Display selected lesion information (read-only)"""
     lesion_data = st.session_state.lesion_data
@@ -497,19 +541,13 @@ def display_selected_lesion():
     else:
         show_info_message(f"Existing Lesion Selected: {lesion_data['lesion_id']}")
 
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.text_input("Location", value=lesion_data['location_display'], disabled=True)
-
-    with col2:
-        st.text_input("Initial Size (mm)", value=f"{lesion_data['initial_size_mm']}", disabled=True)
+    st.markdown(_field_grid_html((
+        ("Location", lesion_data['location_display']),
+        ("Initial Size (mm)", f"{lesion_data['initial_size_mm']}")
+    )), unsafe_allow_html=True)
 
     # Change lesion button
-    if st.button("Change Lesion", key="change_lesion_button"):
-        st.session_state.lesion_data_ready = False
-        st.session_state.lesion_data = None
-        st.rerun()
+    st.button("Change Lesion", key="change_lesion_button", on_click=_change_lesion)
 
 
 # =============================================================================
@@ -544,10 +582,8 @@ def render_analysis_section():
             help=camera_help_html
         )
 
-        image = None
         if uploaded_file is not None:
-            image = Image.open(uploaded_file)
-            st.image(image, caption="Image preview", use_container_width=True)
+            st.image(_preview_bytes(uploaded_file), caption="Image preview", use_container_width=True)
         else:
             show_info_message("Please upload an image to continue")
 
@@ -570,7 +606,13 @@ def render_analysis_section():
         lesion_data = st.session_state.lesion_data
         age = calculate_age_from_dob(patient_data['date_of_birth'])
 
-        show_info_message(f"""Patient: {patient_data['full_name']}<br>Age: {age} years<br>Sex: {patient_data['sex'].title()}<br>Lesion Location: {lesion_data['location_display']}<br>Initial Size: {lesion_data['initial_size_mm']} mm""")
+        show_info_message(
+            f"Patient: {patient_data['full_name']}",
+            f"Age: {age} years",
+            f"Sex: {patient_data['sex'].title()}",
+            f"Lesion Location: {lesion_data['location_display']}",
+            f"Initial Size: {lesion_data['initial_size_mm']} mm"
+        )
 
     # Analyze button
     st.markdown("---")
@@ -580,7 +622,7 @@ def render_analysis_section():
         analyze_button = st.button("Analyze Lesion", use_container_width=True, type="primary", key="analyze_lesion_button")
 
     if analyze_button:
-        if image is None:
+        if uploaded_file is None:
             show_error_message(ERROR_MESSAGES["no_image"])
         else:
             # Validate current size
@@ -591,6 +633,23 @@ def render_analysis_section():
                 perform_analysis(uploaded_file, current_size)
 
 
+def _preview_bytes(uploaded_file) -> bytes:
+    """Downscaled JPEG preview of the upload, decoded once per file and kept in session state"""
+    # file_id is unique per upload, so re-uploading a different photo with the same name and size still refreshes
+    preview_key = uploaded_file.file_id
+    if st.session_state.get('_preview_key') != preview_key:
+        # Deferred: PIL is only needed once a file has been uploaded
+        from PIL import Image
+
+        # Decode from the upload's in-memory bytes; the file's read position is left untouched
+        image = Image.open(BytesIO(uploaded_file.getvalue()))
+        image.thumbnail((1024, 1024))
+        buffer = BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=85)
+        reset_state(_preview_key=preview_key, _preview_bytes=buffer.getvalue())
+    return st.session_state._preview_bytes
+
+
 def perform_analysis(uploaded_file, current_size_mm: float):
     """
     Perform the analysis and create patient/lesion in DB if needed
@@ -608,71 +667,86 @@ def perform_analysis(uploaded_file, current_size_mm: float):
     # Calculate age
     age = calculate_age_from_dob(patient_data['date_of_birth'])
 
-    # Reset file pointer
-    uploaded_file.seek(0)
+    # Read the upload once; requests get independent in-memory views of these bytes
+    image_bytes = uploaded_file.getvalue()
+
+    # Prepare the prediction request before any DB writes, so only the network
+    # calls remain between creating the records and submitting the image
+    image_file = BytesIO(image_bytes)
+    image_file.name = uploaded_file.name  # Used to pick the upload content type
+
+    # Outcome messages are queued and rendered together once the pipeline ends;
+    # step progress is streamed into a single st.status container
+    flash = FlashQueue()
 
     try:
-        with st.spinner("Processing analysis... Creating records and analyzing image..."):
-
-            # STEP 1: Create patient if NEW
-            if st.session_state.patient_is_new:
-                show_info_message("Creating new patient in database...")
-
-                # Generate patient ID
-                patient_id = generate_patient_id()
-
-                # Create patient in DB
-                service = create_patient_lesion_service()
-                patient = service.create_patient(
-                    patient_id=patient_id,
-                    patient_full_name=patient_data['full_name'],
-                    sex=patient_data['sex'],
-                    date_of_birth=patient_data['date_of_birth']
-                )
+        from prediction_service import create_service
+        service = create_patient_lesion_service()
+        prediction_service = create_service()
+
+        with st.status("Processing analysis... Creating records and analyzing image...", expanded=True) as status:
+
+            patient_is_new = st.session_state.patient_is_new
+            lesion_is_new = st.session_state.lesion_is_new
+
+            # Use existing IDs unless the records are created below
+            patient_id = patient_data['patient_id']
+            lesion_id = lesion_data['lesion_id']
+
+            if patient_is_new:
+                patient_payload = {
+                    # Preallocated IDs are single-use so a retry never reuses one
+                    'patient_id': st.session_state.pop('_prealloc_patient_id', None) or generate_patient_id(),
+                    'patient_full_name': patient_data['full_name'],
+                    'sex': patient_data['sex'],
+                    'date_of_birth': patient_data['date_of_birth']
+                }
+            if lesion_is_new:
+                lesion_payload = {
+                    'lesion_id': st.session_state.pop('_prealloc_lesion_id', None) or generate_lesion_id(lesion_data['location']),
+                    'patient_id': patient_id,
+                    'lesion_location': lesion_data['location'],
+                    'initial_size_mm': lesion_data['initial_size_mm']
+                }
 
+            # STEP 1 + 2: Create patient and/or lesion if NEW
+            if patient_is_new and lesion_is_new:
+                status.write("Creating new patient and lesion in database...")
+                patient, lesion = service.create_patient_and_lesion(patient_payload, lesion_payload)
+            elif patient_is_new:
+                status.write("Creating new patient in database...")
+                patient = service.create_patient(**patient_payload)
+            elif lesion_is_new:
+                status.write("Creating new lesion in database...")
+                lesion = service.create_lesion(**lesion_payload)
+
+            if patient_is_new:
                 # Update session state with created patient ID
                 st.session_state.patient_data['patient_id'] = patient.patient_id
                 patient_id = patient.patient_id
 
-                show_success_message(f"Patient created: {patient.patient_full_name} ({patient_id})")
-            else:
-                # Use existing patient ID
-                patient_id = patient_data['patient_id']
-
-            # STEP 2: Create lesion if NEW
-            if st.session_state.lesion_is_new:
-                show_info_message("Creating new lesion in database...")
-
-                # Generate lesion ID
-                lesion_id = generate_lesion_id(lesion_data['location'])
-
-                # Create lesion in DB
-                service = create_patient_lesion_service()
-                lesion = service.create_lesion(
-                    lesion_id=lesion_id,
-                    patient_id=patient_id,
-                    lesion_location=lesion_data['location'],
-                    initial_size_mm=lesion_data['initial_size_mm']
-                )
+                # Patient list changed - drop the cached copies
+                clear_patients_cache()
+                clear_patient_search_cache()
+                st.session_state.pop('_patient_search_cache', None)
 
+                status.write(f"Patient created: {patient.patient_full_name} ({patient_id})")
+
+            if lesion_is_new:
                 # Update session state with created lesion ID
                 st.session_state.lesion_data['lesion_id'] = lesion.lesion_id
                 lesion_id = lesion.lesion_id
 
-                show_success_message(f"Lesion created: {lesion.lesion_id}")
-            else:
-                # Use existing lesion ID
-                lesion_id = lesion_data['lesion_id']
+                # Patient's lesion list changed - drop the cached copy
+                clear_lesions_cache()
 
-            # STEP 3: Perform analysis
-            show_info_message("Analyzing lesion image with AI models...")
+                status.write(f"Lesion created: {lesion.lesion_id}")
 
-            # Reset file pointer again before analysis
-            uploaded_file.seek(0)
+            # STEP 3: Perform analysis
+            status.write("Analyzing lesion image with AI models...")
 
-            prediction_service = create_service()
             response = prediction_service.submit_prediction(
-                image_file=uploaded_file,
+                image_file=image_file,
                 age=age,
                 sex=patient_data['sex'],
                 location=lesion_data['location'],
@@ -681,35 +755,40 @@ def perform_analysis(uploaded_file, current_size_mm: float):
                 lesion_id=lesion_id
             )
 
-            # Store results
-            st.session_state.last_response = response
-            st.session_state.last_uploaded_file = uploaded_file
-            st.session_state.last_input = {
-                'age': age,
-                'sex': patient_data['sex'],
-                'location': lesion_data['location'],
-                'diameter': current_size_mm
-            }
-            st.session_state.last_display_metadata = {
-                'age': age,
-                'sex': patient_data['sex'].title(),
-                'location': lesion_data['location_display'],
-                'diameter': current_size_mm
-            }
-            st.session_state.analysis_complete = True
-            st.session_state.show_shap = False
-
-            # Mark patient and lesion as no longer "new" (they're in DB now)
-            st.session_state.patient_is_new = False
-            st.session_state.lesion_is_new = False
-
-            show_success_message("Analysis completed successfully!")
+            # New analysis stored - history must refetch this lesion's timeline
+            clear_lesion_analyses_cache()
+
+            # Store results and mark patient and lesion as no longer "new" (they're in DB now)
+            reset_state(
+                last_response=response,
+                last_input={
+                    'age': age,
+                    'sex': patient_data['sex'],
+                    'location': lesion_data['location'],
+                    'diameter': current_size_mm
+                },
+                last_display_metadata={
+                    'age': age,
+                    'sex': patient_data['sex'].title(),
+                    'location': lesion_data['location_display'],
+                    'diameter': current_size_mm
+                },
+                analysis_complete=True,
+                show_shap=False,
+                patient_is_new=False,
+                lesion_is_new=False
+            )
+
+            status.update(label="Analysis complete!", state="complete", expanded=False)
+            flash.success("Analysis completed successfully!")
+            flash.flush()
             st.balloons()
             st.rerun()
 
     except Exception as e:
-        show_error_message(f"Analysis failed: {str(e)}")
-        show_info_message(ERROR_MESSAGES["api_connection"].format(api_url=API_BASE_URL))
+        flash.error(f"Analysis failed: {str(e)}")
+        flash.info(ERROR_MESSAGES["api_connection"].format(api_url=API_BASE_URL))
+        flash.flush()
 
         # Important: If we created patient/lesion but analysis failed,
         # they're already in DB. User can retry analysis with same patient/lesion.
@@ -723,6 +802,10 @@ def perform_analysis(uploaded_file, current_size_mm: float):
 
 def render_results_section():
     """Render results section (reusing display functions from main_backup)"""
+    # Deferred: main_backup pulls in the plotting/prediction stack, which is
+    # only needed once an analysis has completed (cached in sys.modules after)
+    import main_backup as display_functions
+
     # Load results icon
     results_icon_base64 = load_image_base64('results.png')
     if results_icon_base64:
@@ -740,6 +823,20 @@ def render_results_section():
 
     # SHAP Explanation Section
     st.markdown("---")
+    render_feature_contribution()
+
+
+def _set_show_shap(value: bool):
+    """Button callback: show or hide the SHAP explanation"""
+    st.session_state.show_shap = value
+
+
+@st.fragment
+def render_feature_contribution():
+    """Render the SHAP explanation block (a fragment, so toggling it only reruns this block)"""
+    import main_backup as display_functions
+    from prediction_service import get_explanation_cached
+
     # Load history icon
     history_icon_base64 = load_image_base64('history.png')
     if history_icon_base64:
@@ -769,24 +866,24 @@ def render_results_section():
         col_exp1, col_exp2, col_exp3 = st.columns([1, 2, 1])
 
         with col_exp2:
-            if st.button("View Feature Contribution", use_container_width=True, type="primary", key="view_shap_button"):
-                st.session_state.show_shap = True
-                st.rerun()
+            st.button(
+                "View Feature Contribution", use_container_width=True, type="primary", key="view_shap_button",
+                on_click=_set_show_shap, args=(True,)
+            )
     else:
         # Show "Hide" button when SHAP is displayed
         col_exp1, col_exp2, col_exp3 = st.columns([1, 2, 1])
 
         with col_exp2:
-            if st.button("Hide Feature Contribution", use_container_width=True, type="secondary", key="hide_shap_button"):
-                st.session_state.show_shap = False
-                st.rerun()
+            st.button(
+                "Hide Feature Contribution", use_container_width=True, type="secondary", key="hide_shap_button",
+                on_click=_set_show_shap, args=(False,)
+            )
 
     # Display SHAP if toggled on
     if st.session_state.show_shap:
         with st.spinner("Generating model explanation... Computing feature contributions..."):
             try:
-                prediction_service = create_service()
-
                 # Get analysis_id from last response
                 if not hasattr(st.session_state, 'last_response'):
                     raise ValueError("No analysis found. Please run the analysis first.")
@@ -799,10 +896,8 @@ def render_results_section():
                 if not analysis_id:
                     raise ValueError("Analysis ID is empty. Please run the analysis first.")
 
-                # Get SHAP explanation using analysis_id
-                explain_response = prediction_service.get_explanation(
-                    analysis_id=analysis_id
-                )
+                # Get SHAP explanation using analysis_id (cached per analysis)
+                explain_response = get_explanation_cached(analysis_id)
 
                 # Display SHAP explanation (chart with top 5 features)
                 display_functions.display_shap_explanation(explain_response)
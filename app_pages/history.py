@@ -10,42 +10,120 @@ This page allows users to:
 """
 
 import streamlit as st
+import numpy as np
+import pandas as pd
 from PIL import Image
-from datetime import datetime
+from io import BytesIO
 import plotly.graph_objects as go
-import sys
-from pathlib import Path
+from string import Template
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from config import FOOTER_HTML, ERROR_MESSAGES, API_BASE_URL, get_risk_color
-from patient_lesion_service import create_patient_lesion_service
+# main.py is run from the repository root, which Streamlit already puts on
+# sys.path, so top-level modules are imported directly
+from config import FOOTER_HTML, ERROR_MESSAGES, API_BASE_URL, RISK_THRESHOLDS, get_risk_color, load_image_base64
+from patient_lesion_service import Patient, search_patients_cached, get_lesions_by_patient_cached
 from analysis_service import create_analysis_service
 from utils.validators import calculate_age_from_dob
-import requests
 
 
-def render():
-    """Main render function for history page"""
+# Patient card / lesion header layout; the static styling lives in app_pages/_styles.py
+# (.profile-card), so each render only substitutes the changing fields
+_PROFILE_FIELD_TMPL = Template(
+    '<div><p class="profile-card__label">$label</p><p class="profile-card__value">$value</p></div>'
+)
+_PATIENT_CARD_TMPL = Template(
+    '<div class="profile-card profile-card--patient"><h2>$icon$name</h2><div class="profile-card__grid">$fields</div></div>'
+)
+_LESION_HEADER_TMPL = Template(
+    '<div class="profile-card"><h3>$title</h3><div class="profile-card__grid">$fields</div></div>'
+)
+
+
+# Explanations shown above the SHAP table and chart tabs
+SHAP_TABLE_INFO_HTML = """
+    <div style="
+        background: linear-gradient(135deg, #e0f2f7 0%, #b3e5f0 100%);
+        border-left: 4px solid #2d8a9b;
+        border-radius: 8px;
+        padding: 1.5rem;
+        margin: 1rem 0;
+    ">
+        <h4 style="color: #2d8a9b; margin-top: 0;">Understanding Feature Contributions</h4>
+        <p style="color: #2d8a9b; margin: 0.5rem 0; font-size: 0.95rem; line-height: 1.6;">
+            This table shows how each feature contributed to the Feature-Based Risk Model's prediction for this specific lesion. Each row represents one feature with its details:
+        </p>
+        <ul style="color: #2d8a9b; margin: 0.5rem 0; font-size: 0.9rem; line-height: 1.7;">
+            <li><strong>Feature</strong>: The name of the characteristic being analyzed (e.g., patient age, color metrics, texture measurements)</li>
+            <li><strong>Value</strong>: The actual measured value of this feature for the current lesion</li>
+            <li><strong>SHAP Value</strong>: How much this feature contributed to the final prediction. Positive values increase risk, negative values decrease risk</li>
+            <li><strong>Impact</strong>: A simplified label indicating whether the feature pushed the prediction towards <span style="color: #ef4444; font-weight: 600;">"Increases Risk"</span> (red background) or <span style="color: #3b82f6; font-weight: 600;">"Decreases Risk"</span> (blue background)</li>
+        </ul>
+        <p style="color: #2d8a9b; margin: 0.5rem 0; font-size: 0.9rem; line-height: 1.6;">
+            Features are sorted by importance (absolute SHAP value), with the most influential features appearing first.
+        </p>
+    </div>
+"""
+
+SHAP_CHART_INFO_HTML = """
+    <div style="
+        background: linear-gradient(135deg, #e0f2f7 0%, #b3e5f0 100%);
+        border-left: 4px solid #2d8a9b;
+        border-radius: 8px;
+        padding: 1.5rem;
+        margin: 1rem 0;
+    ">
+        <h4 style="color: #2d8a9b; margin-top: 0;">Understanding Feature Contributions</h4>
+        <p style="color: #2d8a9b; margin: 0.5rem 0; font-size: 0.95rem; line-height: 1.6;">
+            Each bar shows how much a specific feature influenced the risk estimate for this lesion. This provides transparency and helps interpret the Feature-Based Risk Model's output.
+        </p>
+        <ul style="color: #2d8a9b; margin: 0.5rem 0; font-size: 0.9rem; line-height: 1.7;">
+            <li><span style="color: #ef4444; font-weight: 600;">Red bars (positive values)</span>: Features pushing towards <strong>higher malignancy risk</strong></li>
+            <li><span style="color: #3b82f6; font-weight: 600;">Blue bars (negative values)</span>: Features pushing towards <strong>lower malignancy risk</strong></li>
+            <li><strong>Bar length</strong>: Represents the magnitude of influence on the prediction</li>
+            <li><strong>Base Value</strong>: Average prediction across all training samples</li>
+            <li><strong>Final Prediction</strong>: Base value plus all feature contributions equals the model output</li>
+        </ul>
+    </div>
+"""
+
+# SHAP section views (table first)
+_SHAP_VIEWS = (
+    ":material/table_view: Understanding Feature Contributions",
+    ":material/finance: Chart"
+)
+
+# Shown when a card's advanced analysis is opened (styles in app_pages/_styles.py)
+_ADVANCED_WARNING_HTML = (
+    '<div class="msg msg--warning"><p><strong><span class="material-symbols-rounded mi">warning</span>'
+    'Advanced Technical Analysis:</strong> This section provides detailed technical outputs, including '
+    'extracted features from the Feature Extractor Model and full feature contributions from the '
+    'Feature-Based Risk Model (SHAP analysis). Intended for advanced users and research purposes.</p></div>'
+)
+
+# Rows per page in the patient tables
+_PATIENTS_PAGE_SIZE = 50
 
-    # Utility to load base64 images
-    def load_image_base64(image_filename):
-        """Load image from assets folder and convert to base64"""
-        import base64
-        from pathlib import Path
+# Maximum size (px) of the analysis images shown in the timeline cards
+_THUMBNAIL_SIZE = (640, 640)
 
-        image_path = Path(__file__).parent.parent / "assets" / image_filename
-        if not image_path.exists():
-            return ""
+# Icons used on this page (assets/images)
+_HISTORY_ICONS = ('records.png', 'patient.png')
 
-        with open(image_path, "rb") as f:
-            encoded = base64.b64encode(f.read()).decode()
-            ext = image_path.suffix[1:]  # Remove the dot
-            return f"data:image/{ext};base64,{encoded}"
+
+def _profile_fields_html(fields):
+    """Build the label/value cells of a profile card from (label, value) pairs"""
+    return "".join(_PROFILE_FIELD_TMPL.substitute(label=label, value=value) for label, value in fields)
+
+
+def render():
+    """Main render function for history page"""
+
+    # Encode the page's icons once per session; later reruns read the data URLs
+    # from this dict instead of going through the cache lookup per icon
+    if 'history_icons' not in st.session_state:
+        st.session_state.history_icons = {name: load_image_base64(name) for name in _HISTORY_ICONS}
 
     # Load records icon
-    records_icon_base64 = load_image_base64('records.png')
+    records_icon_base64 = st.session_state.history_icons['records.png']
     records_icon_html = f'<img src="{records_icon_base64}" style="width: 32px; height: 32px; vertical-align: middle; margin-right: 10px;">' if records_icon_base64 else ""
 
     st.markdown(f"# {records_icon_html}Patient History & Medical Records", unsafe_allow_html=True)
@@ -105,39 +183,43 @@ def render_search_by_name():
     """Render search by name with autocomplete"""
     st.markdown("### Search by Patient Name")
 
-    search_term = st.text_input(
-        "Patient name",
-        placeholder="Type at least 2 characters...",
-        help="Search for patients by name",
-        key="history_search_input"
-    )
+    # Query the backend once per submitted search, not on every keystroke
+    with st.form("history_search_form"):
+        search_term = st.text_input(
+            "Patient name",
+            placeholder="Type at least 2 characters...",
+            help="Search for patients by name",
+            key="history_search_input"
+        )
+        submitted = st.form_submit_button("Search")
 
-    if len(search_term) >= 2:
+    if submitted:
+        # Collapse whitespace so "Rod" and " rod  " style variants share one cache entry
+        search_term = " ".join(search_term.split())
+        if len(search_term) >= 2:
+            st.session_state.history_last_search = search_term
+        else:
+            st.session_state.history_last_search = ""
+            st.info("Type at least 2 characters to search")
+
+    search_term = st.session_state.get('history_last_search', "")
+
+    if search_term:
         try:
-            service = create_patient_lesion_service()
-            patients = service.search_patients_by_name(search_term)
+            patients = search_patients_cached(search_term)
 
             if not patients:
                 st.info("No patients found matching your search")
             else:
-                st.markdown(f"Found **{len(patients)}** patient(s):")
-
-                for patient in patients:
-                    col1, col2 = st.columns([3, 1])
+                st.markdown(f"Found **{len(patients)}** patient(s) - select a row to view the history:")
 
-                    with col1:
-                        age = calculate_age_from_dob(patient.date_of_birth)
-                        st.markdown(f"""
-                            **{patient.patient_full_name}**
-                            - ID: `{patient.patient_id}`
-                            - Age: {age} years | Sex: {patient.sex.title()}
-                            - DOB: {patient.date_of_birth}
-                        """)
-
-                    with col2:
-                        if st.button("View History", key=f"view_history_{patient.patient_id}"):
-                            st.session_state.selected_patient_history = patient
-                            st.rerun()
+                selected = render_patient_table(
+                    [(p.patient_full_name, p.patient_id, p.date_of_birth, p.sex) for p in patients],
+                    key="history_search_table"
+                )
+                if selected is not None:
+                    st.session_state.selected_patient_history = patients[selected]
+                    st.rerun()
 
         except Exception as e:
             st.error(f"❌ Search failed: {str(e)}")
@@ -154,40 +236,72 @@ def render_browse_all_patients():
         if not patients_data:
             st.info("No patients found in the system")
         else:
-            st.markdown(f"Total patients: **{len(patients_data)}**")
-
-            # Create table
-            for patient_dict in patients_data:
-                col1, col2 = st.columns([3, 1])
-
-                with col1:
-                    age = calculate_age_from_dob(patient_dict['date_of_birth'])
-                    st.markdown(f"""
-                        **{patient_dict['patient_full_name']}**
-                        - ID: `{patient_dict['patient_id']}`
-                        - Age: {age} years | Sex: {patient_dict['sex'].title()}
-                        - DOB: {patient_dict['date_of_birth']}
-                    """)
-
-                with col2:
-                    if st.button("View History", key=f"view_history_all_{patient_dict['patient_id']}"):
-                        # Convert dict to Patient-like object for consistency
-                        from patient_lesion_service import Patient
-                        patient = Patient(
-                            patient_id=patient_dict['patient_id'],
-                            patient_full_name=patient_dict['patient_full_name'],
-                            sex=patient_dict['sex'],
-                            date_of_birth=patient_dict['date_of_birth'],
-                            created_at=patient_dict.get('created_at'),
-                            _id=patient_dict.get('_id')
-                        )
-                        st.session_state.selected_patient_history = patient
-                        st.rerun()
+            st.markdown(f"Total patients: **{len(patients_data)}** - select a row to view the history:")
+
+            selected = render_patient_table(
+                [(p['patient_full_name'], p['patient_id'], p['date_of_birth'], p['sex']) for p in patients_data],
+                key="history_browse_table"
+            )
+            if selected is not None:
+                patient_dict = patients_data[selected]
+                # Convert dict to Patient-like object for consistency
+                patient = Patient(
+                    patient_id=patient_dict['patient_id'],
+                    patient_full_name=patient_dict['patient_full_name'],
+                    sex=patient_dict['sex'],
+                    date_of_birth=patient_dict['date_of_birth'],
+                    created_at=patient_dict.get('created_at'),
+                    _id=patient_dict.get('_id')
+                )
+                st.session_state.selected_patient_history = patient
+                st.rerun()
 
     except Exception as e:
         st.error(f"❌ Failed to load patients: {str(e)}")
 
 
+def render_patient_table(rows, key):
+    """
+    Render patients as one selectable table (paginated) instead of a widget row per patient
+
+    Args:
+        rows: List of (full_name, patient_id, date_of_birth, sex) tuples
+        key: Widget key prefix for the table and its page selector
+
+    Returns:
+        Index into rows of the selected patient, or None if nothing is selected
+    """
+    offset = 0
+    if len(rows) > _PATIENTS_PAGE_SIZE:
+        page_count = -(-len(rows) // _PATIENTS_PAGE_SIZE)
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key=f"{key}_page")
+        offset = (page - 1) * _PATIENTS_PAGE_SIZE
+        st.caption(f"Page {page} of {page_count}")
+
+    page_rows = rows[offset:offset + _PATIENTS_PAGE_SIZE]
+    names, patient_ids, dobs, sexes = zip(*page_rows)
+    df = pd.DataFrame({
+        'Name': names,
+        'ID': patient_ids,
+        'Age': [calculate_age_from_dob(dob) for dob in dobs],
+        'Sex': [sex.title() for sex in sexes],
+        'DOB': dobs
+    })
+
+    # Key per page so a selection does not carry over to another page
+    event = st.dataframe(
+        df,
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"{key}_{offset}"
+    )
+
+    selected_rows = event.selection.rows
+    return offset + selected_rows[0] if selected_rows else None
+
+
 def render_patient_overview():
     """Render patient overview section"""
     st.markdown("## Patient Overview")
@@ -196,73 +310,44 @@ def render_patient_overview():
     age = calculate_age_from_dob(patient.date_of_birth)
 
     # Load patient icon
-    def load_image_base64(image_filename):
-        """Load image from assets folder and convert to base64"""
-        import base64
-        from pathlib import Path
-
-        image_path = Path(__file__).parent.parent / "assets" / image_filename
-        if not image_path.exists():
-            return ""
-
-        with open(image_path, "rb") as f:
-            encoded = base64.b64encode(f.read()).decode()
-            ext = image_path.suffix[1:]
-            return f"data:image/{ext};base64,{encoded}"
-
-    patient_icon_base64 = load_image_base64('patient.png')
+    patient_icon_base64 = st.session_state.history_icons['patient.png']
     patient_icon_html = f'<img src="{patient_icon_base64}" style="width: 28px; height: 28px; vertical-align: middle; margin-right: 8px;">' if patient_icon_base64 else ""
 
     # Patient info card
-    st.markdown(f"""
-        <div style="
-            background: linear-gradient(135deg, #a8d5dd 0%, #7eb8c4 100%);
-            border-radius: 12px;
-            padding: 1.5rem;
-            color: #0a3940;
-            margin-bottom: 1.5rem;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        ">
-            <h2 style="color: #0a3940; margin: 0 0 1rem 0;">{patient_icon_html}{patient.patient_full_name}</h2>
-            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem;">
-                <div>
-                    <p style="margin: 0; opacity: 0.9; font-size: 0.9rem;">Patient ID</p>
-                    <p style="margin: 0; font-weight: 600; font-size: 1.1rem;">{patient.patient_id}</p>
-                </div>
-                <div>
-                    <p style="margin: 0; opacity: 0.9; font-size: 0.9rem;">Age</p>
-                    <p style="margin: 0; font-weight: 600; font-size: 1.1rem;">{age} years</p>
-                </div>
-                <div>
-                    <p style="margin: 0; opacity: 0.9; font-size: 0.9rem;">Sex</p>
-                    <p style="margin: 0; font-weight: 600; font-size: 1.1rem;">{patient.sex.title()}</p>
-                </div>
-                <div>
-                    <p style="margin: 0; opacity: 0.9; font-size: 0.9rem;">Date of Birth</p>
-                    <p style="margin: 0; font-weight: 600; font-size: 1.1rem;">{patient.date_of_birth}</p>
-                </div>
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_PATIENT_CARD_TMPL.substitute(
+        icon=patient_icon_html,
+        name=patient.patient_full_name,
+        fields=_profile_fields_html((
+            ("Patient ID", patient.patient_id),
+            ("Age", f"{age} years"),
+            ("Sex", patient.sex.title()),
+            ("Date of Birth", patient.date_of_birth)
+        ))
+    ), unsafe_allow_html=True)
 
     # Load patient's lesions
     try:
-        service = create_patient_lesion_service()
-        lesions = service.get_lesions_by_patient(patient.patient_id)
+        lesions = get_lesions_by_patient_cached(patient.patient_id)
         st.session_state.selected_patient_lesions = lesions
+        st.session_state.selected_patient_analyses = {}
 
         # Summary statistics
         total_lesions = len(lesions)
         total_analyses = 0
 
-        # Get analyses count for each lesion
+        # Get analyses count for all lesions (fetched concurrently)
         analysis_service = create_analysis_service()
-        for lesion in lesions:
-            try:
-                analyses = analysis_service.get_lesion_analyses(lesion.lesion_id)
-                total_analyses += len(analyses)
-            except:
-                pass
+        try:
+            summary = analysis_service.get_analysis_summary([l.lesion_id for l in lesions])
+            total_analyses = summary['total_analyses']
+            # Reused by the lesion timelines below instead of fetching again
+            st.session_state.selected_patient_analyses = summary['analyses_by_lesion']
+        except:
+            pass
+
+        # First/last visit from lesion creation dates (one filtering pass)
+        dates = [l.created_at for l in lesions if l.created_at]
+        first_date, last_date = (min(dates), max(dates)) if dates else (None, None)
 
         col1, col2, col3, col4 = st.columns(4)
 
@@ -273,18 +358,10 @@ def render_patient_overview():
             st.metric("Total Analyses", total_analyses)
 
         with col3:
-            if lesions:
-                first_date = min(l.created_at for l in lesions if l.created_at)
-                st.metric("First Visit", first_date[:10] if first_date else "N/A")
-            else:
-                st.metric("First Visit", "N/A")
+            st.metric("First Visit", first_date[:10] if first_date else "N/A")
 
         with col4:
-            if lesions:
-                last_date = max(l.created_at for l in lesions if l.created_at)
-                st.metric("Last Visit", last_date[:10] if last_date else "N/A")
-            else:
-                st.metric("Last Visit", "N/A")
+            st.metric("Last Visit", last_date[:10] if last_date else "N/A")
 
     except Exception as e:
         st.error(f"❌ Failed to load patient data: {str(e)}")
@@ -300,52 +377,39 @@ def render_lesions_and_analyses():
         return
 
     analysis_service = create_analysis_service()
+    # Analyses already fetched for the overview (missing if that fetch failed)
+    analyses_by_lesion = st.session_state.get('selected_patient_analyses') or {}
 
     for lesion in st.session_state.selected_patient_lesions:
         with st.container():
             # Lesion header
-            st.markdown(f"""
-                <div style="
-                    background: linear-gradient(135deg, #a8d5dd 0%, #7eb8c4 100%);
-                    border-radius: 12px;
-                    padding: 1.5rem;
-                    color: #0a3940;
-                    margin: 1rem 0;
-                    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                ">
-                    <h3 style="color: #0a3940; margin: 0 0 1rem 0; font-weight: 600;">{lesion.lesion_location.title()}</h3>
-                    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 1rem;">
-                        <div>
-                            <p style="margin: 0; opacity: 0.9; font-size: 0.9rem;">Lesion ID</p>
-                            <p style="margin: 0; font-weight: 600; font-size: 1.1rem;">{lesion.lesion_id}</p>
-                        </div>
-                        <div>
-                            <p style="margin: 0; opacity: 0.9; font-size: 0.9rem;">Initial Size</p>
-                            <p style="margin: 0; font-weight: 600; font-size: 1.1rem;">{lesion.initial_size_mm} mm</p>
-                        </div>
-                        <div>
-                            <p style="margin: 0; opacity: 0.9; font-size: 0.9rem;">Created</p>
-                            <p style="margin: 0; font-weight: 600; font-size: 1.1rem;">{lesion.created_at[:10] if lesion.created_at else 'N/A'}</p>
-                        </div>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_LESION_HEADER_TMPL.substitute(
+                title=lesion.lesion_location.title(),
+                fields=_profile_fields_html((
+                    ("Lesion ID", lesion.lesion_id),
+                    ("Initial Size", f"{lesion.initial_size_mm} mm"),
+                    ("Created", lesion.created_at[:10] if lesion.created_at else 'N/A')
+                ))
+            ), unsafe_allow_html=True)
 
             # Load analyses for this lesion
             try:
-                analyses = analysis_service.get_lesion_analyses(lesion.lesion_id)
+                analyses = analyses_by_lesion.get(lesion.lesion_id)
+                if analyses is None:
+                    analyses = analysis_service.get_lesion_analyses(lesion.lesion_id)
 
                 if not analyses:
                     st.info(f"No analyses found for {lesion.lesion_id}")
                 else:
-                    # Evolution graphs - size and probability separated
-                    render_size_evolution_graph(lesion, analyses)
-                    render_probability_evolution_graph(lesion, analyses)
+                    # Evolution graphs - size and probability separated (series built once, shared)
+                    dates, sizes, model_a_probs, model_c_probs = _evolution_series(analyses)
+                    render_size_evolution_graph(dates, sizes)
+                    render_probability_evolution_graph(dates, model_a_probs, model_c_probs)
 
                     st.markdown("---")
 
                     # Analysis timeline
-                    render_analysis_timeline(lesion, analyses)
+                    render_analysis_timeline(lesion, analyses, analysis_service)
 
             except Exception as e:
                 st.error(f"❌ Failed to load analyses for {lesion.lesion_id}: {str(e)}")
@@ -353,14 +417,42 @@ def render_lesions_and_analyses():
             # st.markdown("---")
 
 
-def render_size_evolution_graph(lesion, analyses):
-    """Render size evolution graph over time"""
-    st.markdown('<h3 style="margin-bottom: 0.5rem;">Lesion Size Evolution</h3>', unsafe_allow_html=True)
+def format_date(dt):
+    """Format a datetime as DD/MM/YYYY (plain integer formatting, no locale-aware strftime)"""
+    return f"{dt.day:02d}/{dt.month:02d}/{dt.year}"
+
+
+def format_datetime(dt):
+    """Format a datetime as DD/MM/YYYY HH:MM"""
+    return f"{dt.day:02d}/{dt.month:02d}/{dt.year} {dt.hour:02d}:{dt.minute:02d}"
+
+
+def _evolution_series(analyses):
+    """
+    Build the plotting series for the evolution graphs in a single pass
 
-    # Prepare data - dates only (no timestamps)
-    dates = [a.capture_datetime.strftime('%d/%m/%Y') for a in analyses]
-    sizes = [a.lesion_size_mm for a in analyses]
+    Args:
+        analyses: List of AnalysisCase objects (sorted by capture date)
 
+    Returns:
+        Tuple of (dates, sizes, model_a_probs, model_c_probs) tuples (hashable,
+        usable as figure cache keys); dates are formatted without timestamps
+        and probabilities are percentages
+    """
+    dates, sizes, model_a_probs, model_c_probs = [], [], [], []
+    for a in analyses:
+        dates.append(format_date(a.capture_datetime))
+        sizes.append(a.lesion_size_mm)
+        model_a_probs.append(a.model_a_probability * 100)
+        model_c_probs.append(a.model_c_probability * 100)
+    return tuple(dates), tuple(sizes), tuple(model_a_probs), tuple(model_c_probs)
+
+
+# Figures are pure functions of the series, so rebuilding them on every rerun is wasted
+# work; the series are tuples of primitives, which keeps hashing the cache key cheap
+@st.cache_data(max_entries=64, show_spinner=False)
+def _build_size_fig(dates: tuple, sizes: tuple) -> go.Figure:
+    """Build the size evolution figure (cached per series)"""
     # Create figure
     fig = go.Figure()
 
@@ -391,18 +483,18 @@ def render_size_evolution_graph(lesion, analyses):
         font={'family': "Inter, sans-serif"}
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def render_probability_evolution_graph(lesion, analyses):
-    """Render malignancy probability evolution graph over time"""
-    st.markdown('<h3 style="margin-bottom: 0.5rem;">Malignancy Probability Evolution</h3>', unsafe_allow_html=True)
+def render_size_evolution_graph(dates, sizes):
+    """Render size evolution graph over time"""
+    st.markdown('<h3 style="margin-bottom: 0.5rem;">Lesion Size Evolution</h3>', unsafe_allow_html=True)
+    st.plotly_chart(_build_size_fig(dates, sizes), use_container_width=True)
 
-    # Prepare data - dates only (no timestamps)
-    dates = [a.capture_datetime.strftime('%d/%m/%Y') for a in analyses]
-    model_a_probs = [a.model_a_probability * 100 for a in analyses]
-    model_c_probs = [a.model_c_probability * 100 for a in analyses]
 
+@st.cache_data(max_entries=64, show_spinner=False)
+def _build_probability_fig(dates: tuple, model_a_probs: tuple, model_c_probs: tuple) -> go.Figure:
+    """Build the malignancy probability evolution figure (cached per series)"""
     # Create figure
     fig = go.Figure()
 
@@ -452,37 +544,85 @@ def render_probability_evolution_graph(lesion, analyses):
         font={'family': "Inter, sans-serif"}
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def render_probability_evolution_graph(dates, model_a_probs, model_c_probs):
+    """Render malignancy probability evolution graph over time (probabilities in %)"""
+    st.markdown('<h3 style="margin-bottom: 0.5rem;">Malignancy Probability Evolution</h3>', unsafe_allow_html=True)
+    st.plotly_chart(_build_probability_fig(dates, model_a_probs, model_c_probs), use_container_width=True)
 
 
-def render_analysis_timeline(lesion, analyses):
-    """Render timeline of analyses for a lesion"""
+def render_analysis_timeline(lesion, analyses, analysis_service):
+    """Render timeline of analyses for a lesion (images fetched through the shared pooled session)"""
     st.markdown("### Analysis Timeline")
 
     st.markdown(f"**Total analyses:** {len(analyses)}")
 
     # Reverse to show newest first
     for i, analysis in enumerate(reversed(analyses)):
-        render_analysis_card(analysis, len(analyses) - i)
+        render_analysis_card(analysis, len(analyses) - i, analysis_service)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _thumbnail_bytes(analysis_id: str, _image_bytes: bytes) -> bytes:
+    """
+    Downscale an analysis image to a WEBP thumbnail for display
+
+    Cached per analysis_id (the raw bytes are not hashed): analysis images are
+    immutable, so decoding and resizing happen once instead of on every rerun,
+    and the browser receives a small image instead of the full-resolution one.
+    """
+    # Image.open only parses the header; small images are passed through as-is
+    # (st.image accepts the encoded bytes directly)
+    image = Image.open(BytesIO(_image_bytes))
+    if image.width <= _THUMBNAIL_SIZE[0] and image.height <= _THUMBNAIL_SIZE[1]:
+        return _image_bytes
+
+    image.thumbnail(_THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    image.convert("RGB").save(buffer, format="WEBP", quality=80)
+    return buffer.getvalue()
 
 
-def render_analysis_card(analysis, index):
-    """Render a single analysis card in the timeline"""
+def _set_card_loaded(analysis_id):
+    """Button callback: mark an analysis card's details as loaded"""
+    st.session_state[f"expanded_{analysis_id}"] = True
 
-    # Utility to load base64 images
-    def load_image_base64(image_filename):
-        """Load image from assets/images folder and convert to base64"""
-        import base64
-        from pathlib import Path
 
-        image_path = Path(__file__).parent.parent / "assets" / "images" / image_filename
-        if not image_path.exists():
-            return ""
+def analysis_card_title(analysis):
+    """Build the expander title of an analysis card (date, day tag and size)"""
+    capture_date_str = format_datetime(analysis.capture_datetime)
+
+    # Determine if this is the initial analysis
+    is_initial = analysis.days_since_first_observation == 0
+    days_tag = "(Initial)" if is_initial else f"(Day {analysis.days_since_first_observation})"
+
+    return f"{capture_date_str} {days_tag} - Size: {analysis.lesion_size_mm} mm"
 
-        with open(image_path, "rb") as f:
-            encoded = base64.b64encode(f.read()).decode()
-            ext = image_path.suffix[1:]
-            return f"data:image/{ext};base64,{encoded}"
+
+def render_analysis_card(analysis, index, analysis_service):
+    """
+    Render a single analysis card in the timeline
+
+    Streamlit runs the code inside st.expander even when it is collapsed, so
+    only the card expanded by default (index 1) renders its body (image fetch,
+    HTML, SHAP tables) up front; the others wait until "Load details" is clicked.
+    """
+    with st.expander(analysis_card_title(analysis), expanded=(index == 1)):
+        if index == 1 or st.session_state.get(f"expanded_{analysis.analysis_id}", False):
+            render_analysis_card_body(analysis, analysis_service)
+        else:
+            st.button(
+                "Load details",
+                key=f"load_details_{analysis.analysis_id}",
+                on_click=_set_card_loaded,
+                args=(analysis.analysis_id,)
+            )
+
+
+def render_analysis_card_body(analysis, analysis_service):
+    """Render the details of an analysis card (image, risk assessment, advanced analysis)"""
 
     # Calculate risk categories
     risk_a = calculate_risk_category(analysis.model_a_probability)
@@ -491,397 +631,332 @@ def render_analysis_card(analysis, index):
     color_c, _, icon_c = get_risk_color(risk_c)
 
     # Format date
-    capture_date_str = analysis.capture_datetime.strftime("%d/%m/%Y %H:%M")
+    capture_date_str = format_datetime(analysis.capture_datetime)
 
-    # Determine if this is the initial analysis
-    is_initial = analysis.days_since_first_observation == 0
-    days_tag = "(Initial)" if is_initial else f"(Day {analysis.days_since_first_observation})"
+    col1, col2 = st.columns(2)
 
-    # Analysis card
-    with st.expander(f"{capture_date_str} {days_tag} - Size: {analysis.lesion_size_mm} mm", expanded=(index == 1)):
-        col1, col2 = st.columns(2)
+    with col1:
+        # Show lesion image using the dedicated image endpoint
+        # (/api/analyses/{analysis_id}/image, cached per analysis)
+        try:
+            image_bytes = analysis_service.fetch_analysis_image(analysis.analysis_id)
 
-        with col1:
-            # Show lesion image using the dedicated image endpoint
-            try:
-                # Use the new /api/analyses/{analysis_id}/image endpoint
-                image_url = create_analysis_service().get_analysis_image_url(analysis.analysis_id)
-
-                response = requests.get(image_url, timeout=10)
-
-                if response.status_code == 200:
-                    from io import BytesIO
-                    image = Image.open(BytesIO(response.content))
-                    st.image(image, use_container_width=True)
-                    # Show filename below image
-                    if analysis.image_filename:
-                        st.caption(f"{analysis.image_filename}")
-                elif response.status_code == 404:
-                    st.info("No image available for this analysis")
-                else:
-                    st.warning(f"Image not accessible (HTTP {response.status_code})")
-                    if st.session_state.get('show_debug_info', False):
-                        st.caption(f"URL: {image_url}")
+            if image_bytes is None:
+                st.info("No image available for this analysis")
+            else:
+                st.image(_thumbnail_bytes(analysis.analysis_id, image_bytes), use_container_width=True)
+                # Show filename below image
+                if analysis.image_filename:
+                    st.caption(f"{analysis.image_filename}")
 
-            except requests.exceptions.Timeout:
-                st.warning("Image load timeout. Backend may be slow.")
-            except Exception as e:
-                st.warning(f"Could not load image")
-                if st.session_state.get('show_debug_info', False):
-                    with st.expander("Error details"):
-                        st.code(f"URL: {image_url}\nError: {str(e)}")
+        except Exception as e:
+            st.warning(str(e) or "Could not load image")
+            if st.session_state.get('show_debug_info', False):
+                with st.expander("Error details"):
+                    st.code(f"Analysis ID: {analysis.analysis_id}\nError: {str(e)}")
+
+    with col2:
+        # Analysis details in styled box
+        st.markdown(f"""
+            <div style="
+                background: linear-gradient(135deg, #e0f2f7 0%, #b3e5f0 100%);
+                border-radius: 8px;
+                padding: 1rem;
+                margin-bottom: 1rem;
+            ">
+                <p style="margin: 0.3rem 0; color: #0a3940; font-size: 0.95rem;"><strong>Analysis ID:</strong> {analysis.analysis_id}</p>
+                <p style="margin: 0.3rem 0; color: #0a3940; font-size: 0.95rem;"><strong>Capture Date:</strong> {capture_date_str}</p>
+                <p style="margin: 0.3rem 0; color: #0a3940; font-size: 0.95rem;"><strong>Days Since First Observation:</strong> {analysis.days_since_first_observation}</p>
+                <p style="margin: 0.3rem 0; color: #0a3940; font-size: 0.95rem;"><strong>Patient Age:</strong> {analysis.age_at_capture} years</p>
+                <p style="margin: 0.3rem 0; color: #0a3940; font-size: 0.95rem;"><strong>Lesion Size:</strong> {analysis.lesion_size_mm} mm</p>
+            </div>
+        """, unsafe_allow_html=True)
 
-        with col2:
-            # Analysis details in styled box
-            st.markdown(f"""
-                <div style="
-                    background: linear-gradient(135deg, #e0f2f7 0%, #b3e5f0 100%);
-                    border-radius: 8px;
-                    padding: 1rem;
-                    margin-bottom: 1rem;
-                ">
-                    <p style="margin: 0.3rem 0; color: #0a3940; font-size: 0.95rem;"><strong>Analysis ID:</strong> {analysis.analysis_id}</p>
-                    <p style="margin: 0.3rem 0; color: #0a3940; font-size: 0.95rem;"><strong>Capture Date:</strong> {capture_date_str}</p>
-                    <p style="margin: 0.3rem 0; color: #0a3940; font-size: 0.95rem;"><strong>Days Since First Observation:</strong> {analysis.days_since_first_observation}</p>
-                    <p style="margin: 0.3rem 0; color: #0a3940; font-size: 0.95rem;"><strong>Patient Age:</strong> {analysis.age_at_capture} years</p>
-                    <p style="margin: 0.3rem 0; color: #0a3940; font-size: 0.95rem;"><strong>Lesion Size:</strong> {analysis.lesion_size_mm} mm</p>
-                </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown("---")
-
-            # Risk assessment
-            st.markdown("**Risk Assessment:**")
-
-            st.markdown(f"""
-                <div style="
-                    background-color: #f0f9ff;
-                    border-left: 4px solid {color_a};
-                    border-radius: 8px;
-                    padding: 1rem;
-                    margin: 0.5rem 0;
-                ">
-                    <p style="margin: 0; color: #1e40af; font-weight: 600;">Image Classifier Model</p>
-                    <p style="margin: 0.5rem 0 0 0; color: {color_a}; font-size: 1.5rem; font-weight: 700;">
-                        {icon_a} {analysis.model_a_probability:.1%} - {risk_a.upper()}
-                    </p>
-                </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown(f"""
-                <div style="
-                    background-color: #f0fdf4;
-                    border-left: 4px solid {color_c};
-                    border-radius: 8px;
-                    padding: 1rem;
-                    margin: 0.5rem 0;
-                ">
-                    <p style="margin: 0; color: #15803d; font-weight: 600;">Feature-Based Risk Model</p>
-                    <p style="margin: 0.5rem 0 0 0; color: {color_c}; font-size: 1.5rem; font-weight: 700;">
-                        {icon_c} {analysis.model_c_probability:.1%} - {risk_c.upper()}
-                    </p>
-                </div>
-            """, unsafe_allow_html=True)
-
-        # Advanced Analysis Section (SHAP + Extracted Features)
-        if analysis.shap_top_features or (hasattr(analysis, 'extracted_features') and analysis.extracted_features):
-            st.markdown("---")
-
-            # Warning message
-            st.markdown("""
-                <div style="
-                    background-color: #fef3c7;
-                    border-left: 4px solid #f59e0b;
-                    border-radius: 8px;
-                    padding: 1rem;
-                    margin: 1rem 0;
-                ">
-                    <p style="color: #92400e; margin: 0; font-size: 0.9rem;">
-                        <strong><span class="material-symbols-rounded" style="vertical-align: middle; font-size: 1.2rem; margin-right: 0.3rem;">warning</span>Advanced Technical Analysis:</strong> This section provides detailed technical outputs, including extracted features from the Feature Extractor Model and full feature contributions from the Feature-Based Risk Model (SHAP analysis). Intended for advanced users and research purposes.
-                    </p>
-                </div>
-            """, unsafe_allow_html=True)
-
-            # Button to view/hide advanced analysis
-            if not st.session_state.get(f'show_advanced_{analysis.analysis_id}', False):
-                # Show "View" button
-                col_adv1, col_adv2, col_adv3 = st.columns([1, 2, 1])
-                with col_adv2:
-                    if st.button("View Advanced Analysis", use_container_width=True, type="secondary", key=f"view_advanced_{analysis.analysis_id}"):
-                        st.session_state[f'show_advanced_{analysis.analysis_id}'] = True
-                        st.rerun()
-            else:
-                # Show "Hide" button
-                col_close1, col_close2, col_close3 = st.columns([1, 2, 1])
-                with col_close2:
-                    if st.button("Hide Advanced Analysis", use_container_width=True, type="secondary", key=f"hide_advanced_{analysis.analysis_id}"):
-                        st.session_state[f'show_advanced_{analysis.analysis_id}'] = False
-                        st.rerun()
-
-            # Show advanced analysis if toggled
-            if st.session_state.get(f'show_advanced_{analysis.analysis_id}', False):
-                st.markdown("---")
-
-                # EXPANDABLE 1: Extracted Features
-                if hasattr(analysis, 'extracted_features') and analysis.extracted_features:
-                    with st.expander(":material/dynamic_form: Feature Extractor Model – Extracted Features", expanded=False):
-                        st.markdown("""
-                            <div style="
-                                background-color: #fef3c7;
-                                border-left: 4px solid #f59e0b;
-                                border-radius: 8px;
-                                padding: 1rem;
-                                margin: 1rem 0;
-                            ">
-                                <p style="color: #92400e; margin: 0; font-size: 0.9rem;">
-                                    <strong><span class="material-symbols-rounded" style="vertical-align: middle; font-size: 1.2rem; margin-right: 0.3rem;">warning</span>Notice:</strong> This modal shows all quantitative features extracted from the uploaded image by the Feature Extractor Model. Intended for advanced users and research purposes.
-                                </p>
-                            </div>
-                        """, unsafe_allow_html=True)
-
-                        st.markdown("#### Extracted Features – Feature Extractor Model")
-                        st.markdown("**View all numeric features extracted from this lesion image.**")
-
-                        import pandas as pd
-
-                        # Get feature display names mapping
-                        feature_names_map = st.session_state.get('feature_display_names', {})
-
-                        # Create DataFrame
-                        extracted_data = []
-                        for feature in analysis.extracted_features:
-                            feature_name = feature.get('feature_name', 'Unknown')
-                            feature_value = feature.get('value', 0.0)
-
-                            # Get display name from mapping
-                            display_name = feature_names_map.get(feature_name, feature_name)
-
-                            extracted_data.append({
-                                'Feature': display_name,
-                                'Technical Name': feature_name,
-                                'Value': f"{feature_value:.4f}"
-                            })
-
-                        df_extracted = pd.DataFrame(extracted_data)
-
-                        st.dataframe(
-                            df_extracted,
-                            hide_index=True,
-                            use_container_width=True,
-                            height=min(500, len(extracted_data) * 35 + 38)
-                        )
-
-                # EXPANDABLE 2: SHAP Analysis with Tabs
-                if analysis.shap_top_features:
-                    with st.expander(":material/arrow_shape_up_stack: Feature-Based Risk Model – Feature Contribution Analysis", expanded=False):
-                        st.markdown("""
-                            <div style="
-                                background-color: #fef3c7;
-                                border-left: 4px solid #f59e0b;
-                                border-radius: 8px;
-                                padding: 1rem;
-                                margin: 1rem 0;
-                            ">
-                                <p style="color: #92400e; margin: 0; font-size: 0.9rem;">
-                                    <strong><span class="material-symbols-rounded" style="vertical-align: middle; font-size: 1.2rem; margin-right: 0.3rem;">warning</span>Notice:</strong> This modal shows how each feature contributed to the model's risk estimate, presented in both table and chart formats. Intended for advanced users and research purposes.
-                                </p>
-                            </div>
-                        """, unsafe_allow_html=True)
-
-                        # Create Tabs
-                        tab1, tab2 = st.tabs([
-                            ":material/table_view: Understanding Feature Contributions",
-                            ":material/finance: Chart"
-                        ])
-
-                        # Prepare data for both tabs
-                        import pandas as pd
-
-                        df_data = []
-                        for feature_data in analysis.shap_top_features:
-                            display_name = feature_data.get('display_name', feature_data.get('feature', 'Unknown'))
-                            feature_value = feature_data.get('value', 0.0)
-                            shap_value = feature_data.get('shap_value', 0.0)
-                            impact = feature_data.get('impact', 'increases' if shap_value > 0 else 'decreases')
-
-                            df_data.append({
-                                'display_name': display_name,
-                                'value': feature_value,
-                                'shap_value': shap_value,
-                                'impact': impact,
-                                'abs_shap': abs(shap_value)
-                            })
-
-                        # Sort by absolute SHAP value
-                        df_data_sorted = sorted(df_data, key=lambda x: x['abs_shap'], reverse=True)
-
-                        # TAB 1: Understanding and Table
-                        with tab1:
-                            st.markdown("""
-                                <div style="
-                                    background: linear-gradient(135deg, #e0f2f7 0%, #b3e5f0 100%);
-                                    border-left: 4px solid #2d8a9b;
-                                    border-radius: 8px;
-                                    padding: 1.5rem;
-                                    margin: 1rem 0;
-                                ">
-                                    <h4 style="color: #2d8a9b; margin-top: 0;">Understanding Feature Contributions</h4>
-                                    <p style="color: #2d8a9b; margin: 0.5rem 0; font-size: 0.95rem; line-height: 1.6;">
-                                        This table shows how each feature contributed to the Feature-Based Risk Model's prediction for this specific lesion. Each row represents one feature with its details:
-                                    </p>
-                                    <ul style="color: #2d8a9b; margin: 0.5rem 0; font-size: 0.9rem; line-height: 1.7;">
-                                        <li><strong>Feature</strong>: The name of the characteristic being analyzed (e.g., patient age, color metrics, texture measurements)</li>
-                                        <li><strong>Value</strong>: The actual measured value of this feature for the current lesion</li>
-                                        <li><strong>SHAP Value</strong>: How much this feature contributed to the final prediction. Positive values increase risk, negative values decrease risk</li>
-                                        <li><strong>Impact</strong>: A simplified label indicating whether the feature pushed the prediction towards <span style="color: #ef4444; font-weight: 600;">"Increases Risk"</span> (red background) or <span style="color: #3b82f6; font-weight: 600;">"Decreases Risk"</span> (blue background)</li>
-                                    </ul>
-                                    <p style="color: #2d8a9b; margin: 0.5rem 0; font-size: 0.9rem; line-height: 1.6;">
-                                        Features are sorted by importance (absolute SHAP value), with the most influential features appearing first.
-                                    </p>
-                                </div>
-                            """, unsafe_allow_html=True)
-
-                            st.markdown("#### Feature Contributions Table")
-
-                            # Create table DataFrame
-                            table_data = []
-                            for f in df_data_sorted:
-                                impact_label = 'Increases Risk' if f['impact'] == 'increases' else 'Decreases Risk'
-                                table_data.append({
-                                    'Feature': f['display_name'],
-                                    'Value': f"{f['value']:.2f}",
-                                    'SHAP Value': f"{f['shap_value']:+.4f}",
-                                    'Impact': impact_label
-                                })
-
-                            df_table = pd.DataFrame(table_data)
-
-                            # Style the dataframe
-                            def color_impact(val):
-                                if val == 'Increases Risk':
-                                    return 'background-color: #fee2e2; color: #991b1b'
-                                else:
-                                    return 'background-color: #dbeafe; color: #1e40af'
-
-                            styled_df = df_table.style.applymap(color_impact, subset=['Impact'])
-
-                            st.dataframe(
-                                styled_df,
-                                hide_index=True,
-                                use_container_width=True,
-                                height=min(500, len(table_data) * 35 + 38)
-                            )
+        st.markdown("---")
+
+        # Risk assessment
+        st.markdown("**Risk Assessment:**")
+
+        st.markdown(f"""
+            <div style="
+                background-color: #f0f9ff;
+                border-left: 4px solid {color_a};
+                border-radius: 8px;
+                padding: 1rem;
+                margin: 0.5rem 0;
+            ">
+                <p style="margin: 0; color: #1e40af; font-weight: 600;">Image Classifier Model</p>
+                <p style="margin: 0.5rem 0 0 0; color: {color_a}; font-size: 1.5rem; font-weight: 700;">
+                    {icon_a} {analysis.model_a_probability:.1%} - {risk_a.upper()}
+                </p>
+            </div>
+        """, unsafe_allow_html=True)
+
+        st.markdown(f"""
+            <div style="
+                background-color: #f0fdf4;
+                border-left: 4px solid {color_c};
+                border-radius: 8px;
+                padding: 1rem;
+                margin: 0.5rem 0;
+            ">
+                <p style="margin: 0; color: #15803d; font-weight: 600;">Feature-Based Risk Model</p>
+                <p style="margin: 0.5rem 0 0 0; color: {color_c}; font-size: 1.5rem; font-weight: 700;">
+                    {icon_c} {analysis.model_c_probability:.1%} - {risk_c.upper()}
+                </p>
+            </div>
+        """, unsafe_allow_html=True)
+
+    # Advanced Analysis Section (SHAP + Extracted Features)
+    if analysis.shap_top_features or (hasattr(analysis, 'extracted_features') and analysis.extracted_features):
+        render_advanced_analysis(analysis)
+
+
+# SHAP values are immutable per analysis, so the figure is cached by analysis_id
+# alone (the sorted feature frame is passed unhashed)
+@st.cache_data(max_entries=64, show_spinner=False)
+def _build_shap_fig(analysis_id: str, _df_shap: pd.DataFrame, base_val: float, prediction_val: float) -> go.Figure:
+    """Build the SHAP contributions bar chart from the sorted feature frame"""
+    # Trace arrays straight from the frame's columns (vectorized colors and labels)
+    shap_values = _df_shap['shap_value'].to_numpy()
+    colors = np.where(_df_shap['impact'].eq('increases'), '#ef4444', '#3b82f6')
+    labels = np.char.mod('%+.3f', shap_values)
 
-                        # TAB 2: Chart with ALL features
-                        with tab2:
-                            st.markdown("""
-                                <div style="
-                                    background: linear-gradient(135deg, #e0f2f7 0%, #b3e5f0 100%);
-                                    border-left: 4px solid #2d8a9b;
-                                    border-radius: 8px;
-                                    padding: 1.5rem;
-                                    margin: 1rem 0;
-                                ">
-                                    <h4 style="color: #2d8a9b; margin-top: 0;">Understanding Feature Contributions</h4>
-                                    <p style="color: #2d8a9b; margin: 0.5rem 0; font-size: 0.95rem; line-height: 1.6;">
-                                        Each bar shows how much a specific feature influenced the risk estimate for this lesion. This provides transparency and helps interpret the Feature-Based Risk Model's output.
-                                    </p>
-                                    <ul style="color: #2d8a9b; margin: 0.5rem 0; font-size: 0.9rem; line-height: 1.7;">
-                                        <li><span style="color: #ef4444; font-weight: 600;">Red bars (positive values)</span>: Features pushing towards <strong>higher malignancy risk</strong></li>
-                                        <li><span style="color: #3b82f6; font-weight: 600;">Blue bars (negative values)</span>: Features pushing towards <strong>lower malignancy risk</strong></li>
-                                        <li><strong>Bar length</strong>: Represents the magnitude of influence on the prediction</li>
-                                        <li><strong>Base Value</strong>: Average prediction across all training samples</li>
-                                        <li><strong>Final Prediction</strong>: Base value plus all feature contributions equals the model output</li>
-                                    </ul>
-                                </div>
-                            """, unsafe_allow_html=True)
-
-                            st.markdown("#### SHAP Feature Contributions – All Features")
-
-                            # Display summary metrics if available
-                            if hasattr(analysis, 'shap_prediction') and hasattr(analysis, 'shap_base_value'):
-                                col1, col2, col3 = st.columns(3)
-                                with col1:
-                                    st.metric(
-                                        "Feature-Based Risk Model",
-                                        f"{analysis.shap_prediction:.1%}",
-                                        help="Final prediction probability from Feature-Based Risk Model (XGBoost)"
-                                    )
-                                with col2:
-                                    st.metric(
-                                        "Base Value",
-                                        f"{analysis.shap_base_value:.1%}",
-                                        help="The average prediction across all training samples"
-                                    )
-                                with col3:
-                                    impact_sum = sum(abs(f.get('shap_value', 0)) for f in df_data_sorted)
-                                    st.metric(
-                                        "Total Impact",
-                                        f"{impact_sum:.3f}",
-                                        help="Sum of absolute SHAP values"
-                                    )
-
-                            # ALL features for the chart (not just top 15)
-                            all_features = df_data_sorted
-
-                            # Prepare chart data
-                            feature_names = [f['display_name'] for f in all_features]
-                            shap_values = [f['shap_value'] for f in all_features]
-                            feature_values = [f['value'] for f in all_features]
-                            colors = ['#ef4444' if f['impact'] == 'increases' else '#3b82f6' for f in all_features]
-
-                            # Create horizontal bar chart
-                            fig = go.Figure()
-
-                            fig.add_trace(go.Bar(
-                                y=feature_names,
-                                x=shap_values,
-                                orientation='h',
-                                marker=dict(
-                                    color=colors,
-                                    line=dict(color='rgba(0,0,0,0.3)', width=1)
-                                ),
-                                text=[f"{sv:+.3f}" for sv in shap_values],
-                                textposition='outside',
-                                hovertemplate='<b>%{y}</b><br>' +
-                                              'SHAP Value: %{x:.4f}<br>' +
-                                              'Feature Value: %{customdata:.2f}<br>' +
-                                              '<extra></extra>',
-                                customdata=feature_values
-                            ))
-
-                            # Get prediction and base value if available
-                            prediction_val = getattr(analysis, 'shap_prediction', analysis.model_c_probability)
-                            base_val = getattr(analysis, 'shap_base_value', 0.5)
-
-                            # Calculate dynamic height based on number of features
-                            chart_height = max(600, len(all_features) * 25)
-
-                            fig.update_layout(
-                                title=dict(
-                                    text=f"SHAP Values (Base: {base_val:.3f} → Prediction: {prediction_val:.3f})",
-                                    font=dict(size=14)
-                                ),
-                                xaxis_title="SHAP Value Contribution",
-                                yaxis_title="Features",
-                                height=chart_height,
-                                margin=dict(l=20, r=100, t=60, b=40),
-                                paper_bgcolor="rgba(0,0,0,0)",
-                                plot_bgcolor="rgba(250,250,250,1)",
-                                font={'family': "Inter, sans-serif"},
-                                xaxis=dict(
-                                    gridcolor='#e5e7eb',
-                                    gridwidth=1,
-                                    zeroline=True,
-                                    zerolinecolor='#374151',
-                                    zerolinewidth=2
-                                ),
-                                yaxis=dict(
-                                    autorange="reversed"  # Show most important at top
-                                )
+    # Create horizontal bar chart
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        y=_df_shap['display_name'].to_numpy(),
+        x=shap_values,
+        orientation='h',
+        marker=dict(
+            color=colors,
+            line=dict(color='rgba(0,0,0,0.3)', width=1)
+        ),
+        text=labels,
+        textposition='outside',
+        hovertemplate='<b>%{y}</b><br>' +
+                      'SHAP Value: %{x:.4f}<br>' +
+                      'Feature Value: %{customdata:.2f}<br>' +
+                      '<extra></extra>',
+        customdata=_df_shap['value'].to_numpy()
+    ))
+
+    # Calculate dynamic height based on number of features
+    chart_height = max(600, len(shap_values) * 25)
+
+    fig.update_layout(
+        title=dict(
+            text=f"SHAP Values (Base: {base_val:.3f} → Prediction: {prediction_val:.3f})",
+            font=dict(size=14)
+        ),
+        xaxis_title="SHAP Value Contribution",
+        yaxis_title="Features",
+        height=chart_height,
+        margin=dict(l=20, r=100, t=60, b=40),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(250,250,250,1)",
+        font={'family': "Inter, sans-serif"},
+        xaxis=dict(
+            gridcolor='#e5e7eb',
+            gridwidth=1,
+            zeroline=True,
+            zerolinecolor='#374151',
+            zerolinewidth=2
+        ),
+        yaxis=dict(
+            autorange="reversed"  # Show most important at top
+        )
+    )
+
+    return fig
+
+
+def _impact_column_styles(impact):
+    """Styler.apply callback: CSS for a whole Impact column in one vectorized call"""
+    return np.where(
+        impact.eq('Increases Risk'),
+        'background-color: #fee2e2; color: #991b1b',
+        'background-color: #dbeafe; color: #1e40af'
+    )
+
+
+@st.fragment
+def render_advanced_analysis(analysis):
+    """
+    Render the advanced analysis section of a card (extracted features and SHAP)
+
+    Runs as a fragment, so flipping the toggle reruns only this section
+    instead of the whole history page (lesions, graphs and every card).
+    """
+    st.markdown("---")
+
+    # Toggle to view/hide advanced analysis (state lives in the widget key)
+    col_adv1, col_adv2, col_adv3 = st.columns([1, 2, 1])
+    with col_adv2:
+        show_advanced = st.toggle("View Advanced Analysis", key=f'show_advanced_{analysis.analysis_id}')
+
+    # Show advanced analysis if toggled (warning included, so collapsed cards stay small)
+    if show_advanced:
+        st.markdown(_ADVANCED_WARNING_HTML, unsafe_allow_html=True)
+        st.markdown("---")
+
+        # EXPANDABLE 1: Extracted Features
+        if hasattr(analysis, 'extracted_features') and analysis.extracted_features:
+            with st.expander(":material/dynamic_form: Feature Extractor Model – Extracted Features", expanded=False):
+                st.markdown("""
+                    <div style="
+                        background-color: #fef3c7;
+                        border-left: 4px solid #f59e0b;
+                        border-radius: 8px;
+                        padding: 1rem;
+                        margin: 1rem 0;
+                    ">
+                        <p style="color: #92400e; margin: 0; font-size: 0.9rem;">
+                            <strong><span class="material-symbols-rounded" style="vertical-align: middle; font-size: 1.2rem; margin-right: 0.3rem;">warning</span>Notice:</strong> This modal shows all quantitative features extracted from the uploaded image by the Feature Extractor Model. Intended for advanced users and research purposes.
+                        </p>
+                    </div>
+                """, unsafe_allow_html=True)
+
+                st.markdown("#### Extracted Features – Feature Extractor Model")
+                st.markdown("**View all numeric features extracted from this lesion image.**")
+
+                # Get feature display names mapping
+                feature_names_map = st.session_state.get('feature_display_names', {})
+
+                # Create DataFrame column by column (values stay numeric for sorting)
+                extracted_features = analysis.extracted_features
+                display_name_for = feature_names_map.get
+                technical_names = [f.get('feature_name', 'Unknown') for f in extracted_features]
+                df_extracted = pd.DataFrame({
+                    'Feature': [display_name_for(name, name) for name in technical_names],
+                    'Technical Name': technical_names,
+                    'Value': [f.get('value', 0.0) for f in extracted_features]
+                })
+
+                st.dataframe(
+                    df_extracted,
+                    hide_index=True,
+                    use_container_width=True,
+                    height=min(500, len(df_extracted) * 35 + 38),
+                    column_config={'Value': st.column_config.NumberColumn(format="%.4f")}
+                )
+
+        # EXPANDABLE 2: SHAP Analysis with Tabs
+        if analysis.shap_top_features:
+            with st.expander(":material/arrow_shape_up_stack: Feature-Based Risk Model – Feature Contribution Analysis", expanded=False):
+                st.markdown("""
+                    <div style="
+                        background-color: #fef3c7;
+                        border-left: 4px solid #f59e0b;
+                        border-radius: 8px;
+                        padding: 1rem;
+                        margin: 1rem 0;
+                    ">
+                        <p style="color: #92400e; margin: 0; font-size: 0.9rem;">
+                            <strong><span class="material-symbols-rounded" style="vertical-align: middle; font-size: 1.2rem; margin-right: 0.3rem;">warning</span>Notice:</strong> This modal shows how each feature contributed to the model's risk estimate, presented in both table and chart formats. Intended for advanced users and research purposes.
+                        </p>
+                    </div>
+                """, unsafe_allow_html=True)
+
+                # Tab-like view switch: unlike st.tabs, only the selected view's body runs
+                shap_view = st.radio(
+                    "View",
+                    _SHAP_VIEWS,
+                    horizontal=True,
+                    label_visibility="collapsed",
+                    key=f"shap_view_{analysis.analysis_id}"
+                )
+
+                # Prepare data for both views
+                # One column list per field (no per-row dicts), filled in a single pass
+                display_names, feature_values, shap_values, impacts = [], [], [], []
+                for feature_data in analysis.shap_top_features:
+                    # Bind the dict lookup once per feature instead of per field
+                    get = feature_data.get
+                    shap_value = get('shap_value', 0.0)
+                    display_names.append(get('display_name', get('feature', 'Unknown')))
+                    feature_values.append(get('value', 0.0))
+                    shap_values.append(shap_value)
+                    impacts.append(get('impact', 'increases' if shap_value > 0 else 'decreases'))
+
+                # Sort by absolute SHAP value: one stable argsort, applied to every column
+                # SHAP values are small, so float32 keeps their 3-4 displayed decimals; raw feature
+                # values (areas, pixel counts) can be large and stay float64
+                shap_arr = np.asarray(shap_values, dtype=np.float32)
+                abs_shap = np.abs(shap_arr)
+                order = np.argsort(-abs_shap, kind='stable')
+                df_shap = pd.DataFrame({
+                    'display_name': np.asarray(display_names, dtype=object)[order],
+                    'value': np.asarray(feature_values, dtype=np.float64)[order],
+                    'shap_value': shap_arr[order],
+                    'impact': np.asarray(impacts, dtype=object)[order]
+                })
+
+                # VIEW 1: Understanding and Table
+                if shap_view == _SHAP_VIEWS[0]:
+                    st.markdown(SHAP_TABLE_INFO_HTML, unsafe_allow_html=True)
+
+                    st.markdown("#### Feature Contributions Table")
+
+                    # Create table DataFrame from the sorted columns; numbers stay numeric
+                    # (formatted for display only, so the columns sort numerically)
+                    df_table = pd.DataFrame({
+                        'Feature': df_shap['display_name'].to_numpy(),
+                        'Value': df_shap['value'].to_numpy(),
+                        'SHAP Value': df_shap['shap_value'].to_numpy(),
+                        'Impact': np.where(df_shap['impact'].eq('increases'), 'Increases Risk', 'Decreases Risk')
+                    })
+
+                    # Style the dataframe; the Styler also carries the display format
+                    styled_df = (
+                        df_table.style
+                        .apply(_impact_column_styles, subset=['Impact'])
+                        .format({'Value': '{:.2f}', 'SHAP Value': '{:+.4f}'})
+                    )
+
+                    st.dataframe(
+                        styled_df,
+                        hide_index=True,
+                        use_container_width=True,
+                        height=min(500, len(df_table) * 35 + 38)
+                    )
+
+                # VIEW 2: Chart with ALL features
+                else:
+                    st.markdown(SHAP_CHART_INFO_HTML, unsafe_allow_html=True)
+
+                    st.markdown("#### SHAP Feature Contributions – All Features")
+
+                    # Display summary metrics if available
+                    if hasattr(analysis, 'shap_prediction') and hasattr(analysis, 'shap_base_value'):
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.metric(
+                                "Feature-Based Risk Model",
+                                f"{analysis.shap_prediction:.1%}",
+                                help="Final prediction probability from Feature-Based Risk Model (XGBoost)"
+                            )
+                        with col2:
+                            st.metric(
+                                "Base Value",
+                                f"{analysis.shap_base_value:.1%}",
+                                help="The average prediction across all training samples"
+                            )
+                        with col3:
+                            impact_sum = float(abs_shap.sum())
+                            st.metric(
+                                "Total Impact",
+                                f"{impact_sum:.3f}",
+                                help="Sum of absolute SHAP values"
                             )
 
-                            st.plotly_chart(fig, use_container_width=True)
+                    # ALL features for the chart (not just top 15), built once per analysis
+                    prediction_val = getattr(analysis, 'shap_prediction', analysis.model_c_probability)
+                    base_val = getattr(analysis, 'shap_base_value', 0.5)
+                    fig = _build_shap_fig(analysis.analysis_id, df_shap, base_val, prediction_val)
+
+                    st.plotly_chart(fig, use_container_width=True)
 
 
 def calculate_risk_category(probability: float) -> str:
@@ -894,8 +969,6 @@ def calculate_risk_category(probability: float) -> str:
     Returns:
         Risk category: "low", "medium", or "high"
     """
-    from config import RISK_THRESHOLDS
-
     if probability < RISK_THRESHOLDS["low"]:
         return "low"
     elif probability < RISK_THRESHOLDS["medium"]:
@@ -3,9 +3,55 @@ Home Page - Landing page with information about the tool
 """
 
 import streamlit as st
+from functools import lru_cache
+from string import Template
 from config import FOOTER_HTML, load_image_base64
 
 
+# Key feature cards (Material Symbols icon, title, description)
+_FEATURES = (
+    ("splitscreen_left", "Dual Model Analysis", "Two complementary AI models provide comprehensive risk assessment"),
+    # ("clinical_notes", "Patient Management", "Complete patient and lesion tracking system"),
+    ("calendar_month", "Temporal Tracking", "Monitor lesion changes over time"),
+    ("area_chart", "Key Influencing Factors", "Understand why the AI made its predictions"),
+    ("database", "Database Storage", "Secure storage of all analyses and patient data"),
+    ("sentiment_satisfied", "User-Friendly Interface", "Intuitive design for healthcare professionals")
+)
+
+_FEATURE_CARD_TMPL = Template("""
+    <div style="
+        background-color: #f9fafb;
+        border-radius: 8px;
+        padding: 1rem;
+        margin: 0.5rem 0;
+    ">
+        <p style="margin: 0; color: #1e6b7a; font-weight: 600;">
+            <span class="material-symbols-rounded" style="font-size: 1.3rem; vertical-align: middle; margin-right: 0.5rem;">$icon</span>
+            $title
+        </p>
+        <p style="margin: 0.5rem 0 0 0; color: #6b7280; font-size: 0.9rem;">$description</p>
+    </div>
+""")
+
+# Cards never change at runtime: even-indexed cards go left, odd-indexed right
+_FEATURE_COLUMNS_HTML = tuple(
+    "".join(
+        _FEATURE_CARD_TMPL.substitute(icon=icon, title=title, description=description)
+        for icon, title, description in _FEATURES[start::2]
+    )
+    for start in (0, 1)
+)
+
+
+@lru_cache(maxsize=8)
+def _heading_icon_html(image_filename, alt):
+    """Build the <img> tag for a section heading icon once per asset (empty if missing)"""
+    icon_base64 = load_image_base64(image_filename)
+    if not icon_base64:
+        return ""
+    return f'<img src="{icon_base64}" alt="{alt}" style="height: 1.5rem; width: auto; vertical-align: middle; margin-right: 0.5rem;">'
+
+
 def render():
     """Render the home page"""
 
@@ -35,14 +81,8 @@ def render():
         </div>
     """, unsafe_allow_html=True)
 
-    # How it works - Load lupa.png icon
-    lupa_base64 = load_image_base64('lupa.png')
-    if lupa_base64:
-        lupa_html = f'<img src="{lupa_base64}" alt="Search" style="height: 1.5rem; width: auto; vertical-align: middle; margin-right: 0.5rem;">'
-    else:
-        lupa_html = ""
-
-    st.markdown(f"## {lupa_html}How It Works", unsafe_allow_html=True)
+    # How it works - lupa.png icon
+    st.markdown(f"## {_heading_icon_html('lupa.png', 'Search')}How It Works", unsafe_allow_html=True)
 
     col1, col2, col3 = st.columns(3)
 
@@ -106,42 +146,17 @@ def render():
             </div>
         """, unsafe_allow_html=True)
 
-    # Feature highlights - Load key_features.png icon
-    key_features_base64 = load_image_base64('key_features.png')
-    if key_features_base64:
-        key_features_html = f'<img src="{key_features_base64}" alt="Key Features" style="height: 1.5rem; width: auto; vertical-align: middle; margin-right: 0.5rem;">'
-    else:
-        key_features_html = ""
-
-    st.markdown(f"## {key_features_html}Key Features", unsafe_allow_html=True)
-
-    features = [
-        ("splitscreen_left", "Dual Model Analysis", "Two complementary AI models provide comprehensive risk assessment"),
-        # ("clinical_notes", "Patient Management", "Complete patient and lesion tracking system"),
-        ("calendar_month", "Temporal Tracking", "Monitor lesion changes over time"),
-        ("area_chart", "Key Influencing Factors", "Understand why the AI made its predictions"),
-        ("database", "Database Storage", "Secure storage of all analyses and patient data"),
-        ("sentiment_satisfied", "User-Friendly Interface", "Intuitive design for healthcare professionals")
-    ]
+    # Feature highlights - key_features.png icon
+    st.markdown(f"## {_heading_icon_html('key_features.png', 'Key Features')}Key Features", unsafe_allow_html=True)
 
+    # Alternate cards between the two columns, one markdown element per column
     col1, col2 = st.columns(2)
 
-    for i, (icon_name, title, description) in enumerate(features):
-        with col1 if i % 2 == 0 else col2:
-            st.markdown(f"""
-                <div style="
-                    background-color: #f9fafb;
-                    border-radius: 8px;
-                    padding: 1rem;
-                    margin: 0.5rem 0;
-                ">
-                    <p style="margin: 0; color: #1e6b7a; font-weight: 600;">
-                        <span class="material-symbols-rounded" style="font-size: 1.3rem; vertical-align: middle; margin-right: 0.5rem;">{icon_name}</span>
-                        {title}
-                    </p>
-                    <p style="margin: 0.5rem 0 0 0; color: #6b7280; font-size: 0.9rem;">{description}</p>
-                </div>
-            """, unsafe_allow_html=True)
+    with col1:
+        st.markdown(_FEATURE_COLUMNS_HTML[0], unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(_FEATURE_COLUMNS_HTML[1], unsafe_allow_html=True)
 
     # Call to action
     st.markdown("---")
@@ -5,7 +5,12 @@ This module contains all configuration constants and settings used across the ap
 Centralized configuration makes it easy to modify settings without changing code in multiple places.
 """
 
+import base64
+import os
+from pathlib import Path
 import streamlit as st
+from functools import lru_cache
+from types import MappingProxyType
 
 # =============================================================================
 # API CONFIGURATION
@@ -13,18 +18,22 @@ import streamlit as st
 
 # Backend API base URL
 # In production (Streamlit Cloud), reads from secrets
-# In development (local), uses localhost
+# Otherwise the SKIN_LESION_API_URL environment variable, falling back to localhost
+_DEFAULT_API_BASE_URL = os.environ.get("SKIN_LESION_API_URL", "http://localhost:8000")
 try:
-    API_BASE_URL = st.secrets.get("API_BASE_URL", "http://localhost:8000")
+    API_BASE_URL = st.secrets.get("API_BASE_URL", _DEFAULT_API_BASE_URL)
 except:
     # Fallback if streamlit is not initialized yet or secrets don't exist
-    API_BASE_URL = "http://localhost:8000"
+    API_BASE_URL = _DEFAULT_API_BASE_URL
 
 # API request timeout in seconds
 API_TIMEOUT = 30
 
-# API endpoints (relative to base URL)
-API_ENDPOINTS = {
+# Timeout for analysis image downloads in seconds
+IMAGE_TIMEOUT = 10
+
+# API endpoints (relative to base URL), read-only
+API_ENDPOINTS = MappingProxyType({
     "health": "/health",
     "info": "/",
     "predict": "/api/predict",
@@ -39,7 +48,7 @@ API_ENDPOINTS = {
     "analysis_by_id": "/api/analyses/{analysis_id}",
     "analysis_image": "/api/analyses/{analysis_id}/image",
     "feature_names": "/api/feature-names"
-}
+})
 
 
 # =============================================================================
@@ -51,9 +60,19 @@ PAGE_CONFIG = {
     "page_title": "Skin Lesion Analyzer",
     "page_icon": "🩺",
     "layout": "wide",
-    "initial_sidebar_state": "expanded"
+    "initial_sidebar_state": os.environ.get("SKIN_LESION_SIDEBAR_STATE", "expanded")
 }
 
+# Sidebar navigation as (page key, button label) pairs in display order.
+# Kept here rather than in main.py, which Streamlit re-executes on every rerun
+NAV_PAGES = (
+    ("Home", "Overview"),
+    ("Analysis", "Assessment"),
+    ("History", "History"),
+    ("About", "About")
+)
+NAV_PAGE_LABELS = MappingProxyType(dict(NAV_PAGES))
+
 # Supported image file types
 SUPPORTED_IMAGE_TYPES = ["png", "jpg", "jpeg", "bmp", "tiff"]
 
@@ -70,38 +89,47 @@ MAX_FILE_SIZE_MB = 10
 # =============================================================================
 
 # Master configuration for anatomical locations
-# Format: {display_name: (api_value, location_code)}
-ANATOMICAL_LOCATIONS = {
-    "Head and Neck": {"api_value": "head & neck", "code": "HN"},
-    "Torso Front": {"api_value": "torso front", "code": "FT"},
-    "Torso Back": {"api_value": "torso back", "code": "BT"},
-    "Left Leg": {"api_value": "left leg", "code": "LL"},
-    "Right Leg": {"api_value": "right leg", "code": "RL"},
-    "Left Arm": {"api_value": "left arm", "code": "LA"},
-    "Right Arm": {"api_value": "right arm", "code": "RA"}
-}
-
-# Valid anatomical locations for API validation
-VALID_ANATOMICAL_LOCATIONS = [loc["api_value"] for loc in ANATOMICAL_LOCATIONS.values()]
+# Format: {display_name: {api_value, code}} (read-only: derived lookups below are built from it once)
+ANATOMICAL_LOCATIONS = MappingProxyType({
+    display: MappingProxyType(data) for display, data in {
+        "Head and Neck": {"api_value": "head & neck", "code": "HN"},
+        "Torso Front": {"api_value": "torso front", "code": "FT"},
+        "Torso Back": {"api_value": "torso back", "code": "BT"},
+        "Left Leg": {"api_value": "left leg", "code": "LL"},
+        "Right Leg": {"api_value": "right leg", "code": "RL"},
+        "Left Arm": {"api_value": "left arm", "code": "LA"},
+        "Right Arm": {"api_value": "right arm", "code": "RA"}
+    }.items()
+})
+
+# Display names in UI order (used as selectbox options)
+ANATOMICAL_LOCATION_KEYS = tuple(ANATOMICAL_LOCATIONS.keys())
+
+# Valid anatomical locations for API validation (membership checks only)
+VALID_ANATOMICAL_LOCATIONS = frozenset(loc["api_value"] for loc in ANATOMICAL_LOCATIONS.values())
 
 # UI display names mapped to API values (for backward compatibility)
 LOCATION_DISPLAY_NAMES = {
     display: data["api_value"] for display, data in ANATOMICAL_LOCATIONS.items()
 }
 
+# API values mapped to location codes (reverse lookup, built once)
+_API_TO_CODE = {data["api_value"]: data["code"] for data in ANATOMICAL_LOCATIONS.values()}
+
 # Helper functions for location handling
 def get_location_code(api_location: str) -> str:
     """Get location code from API location value"""
-    for data in ANATOMICAL_LOCATIONS.values():
-        if data["api_value"] == api_location:
-            return data["code"]
-    raise ValueError(f"Unknown location: {api_location}")
+    try:
+        return _API_TO_CODE[api_location]
+    except KeyError:
+        raise ValueError(f"Unknown location: {api_location}") from None
 
 def get_api_location_from_display(display_name: str) -> str:
     """Get API location value from display name"""
-    if display_name in ANATOMICAL_LOCATIONS:
-        return ANATOMICAL_LOCATIONS[display_name]["api_value"]
-    raise ValueError(f"Unknown display name: {display_name}")
+    try:
+        return LOCATION_DISPLAY_NAMES[display_name]
+    except KeyError:
+        raise ValueError(f"Unknown display name: {display_name}") from None
 
 # Patient age constraints
 AGE_MIN = 0
@@ -115,7 +143,7 @@ DIAMETER_DEFAULT = 5.0
 DIAMETER_STEP = 0.5
 
 # Sex options
-SEX_OPTIONS = ["Male", "Female"]
+SEX_OPTIONS = ("Male", "Female")
 
 # Date format for patient date of birth
 DATE_FORMAT = "DD/MM/YYYY"
@@ -132,13 +160,14 @@ RISK_THRESHOLDS = {
     "medium": 0.7    # 0.3-0.7 = MEDIUM, >= 0.7 = HIGH
 }
 
-# Risk category colors (primary_color, background_color, icon - Material Symbols)
-RISK_COLORS = {
+# Risk category colors (primary_color, background_color, icon - Material Symbols), read-only
+# since get_risk_color memoizes lookups into it
+RISK_COLORS = MappingProxyType({
     "low": ("#22c55e", "#f0fdf4", '<span class="material-symbols-rounded" style="vertical-align: middle;">verified_user</span>'),
     "medium": ("#f59e0b", "#fffbeb", '<span class="material-symbols-rounded" style="vertical-align: middle;">gpp_maybe</span>'),
     "high": ("#ef4444", "#fef2f2", '<span class="material-symbols-rounded" style="vertical-align: middle;">gpp_bad</span>'),
     "unknown": ("#6b7280", "#f3f4f6", '<span class="material-symbols-rounded" style="vertical-align: middle;">info</span>')
-}
+})
 
 
 # =============================================================================
@@ -162,9 +191,6 @@ GAUGE_CONFIG = {
     "threshold_value": 70
 }
 
-# Feature display settings
-FEATURES_PER_ROW = 6
-
 
 # =============================================================================
 # MODEL INFORMATION
@@ -236,9 +262,13 @@ VERBOSE_LOGGING = False
 # HELPER FUNCTIONS
 # =============================================================================
 
+# UI image assets (icons, logo)
+_IMAGES_DIR = Path(__file__).parent / "assets" / "images"
+
+@lru_cache(maxsize=32)
 def get_api_url(endpoint_key: str = None) -> str:
     """
-    Get the full API URL for a specific endpoint
+    Get the full API URL for a specific endpoint (memoized per key)
 
     Args:
         endpoint_key: Key from API_ENDPOINTS dict (e.g., "predict", "health")
@@ -254,9 +284,10 @@ def get_api_url(endpoint_key: str = None) -> str:
     return f"{API_BASE_URL}{endpoint}"
 
 
+@lru_cache(maxsize=8)
 def get_risk_color(risk_category: str) -> tuple:
     """
-    Get color scheme for a risk category
+    Get color scheme for a risk category (memoized: only a handful of distinct inputs)
 
     Args:
         risk_category: Risk category string ("low", "medium", "high")
@@ -277,12 +308,20 @@ def map_location_to_api(display_name: str) -> str:
     Returns:
         Location name in API format
     """
-    return LOCATION_DISPLAY_NAMES.get(display_name, display_name.lower())
+    # Only lowercase on a miss; known display names are returned as-is
+    try:
+        return LOCATION_DISPLAY_NAMES[display_name]
+    except KeyError:
+        return display_name.lower()
 
 
+# lru_cache in front of st.cache_data: repeat calls in a process skip Streamlit's
+# hashing/copying, and callers outside a Streamlit run still get memoization
+@lru_cache(maxsize=32)
+@st.cache_data(max_entries=32, show_spinner=False)
 def load_image_base64(filename: str) -> str:
     """
-    Load image from assets/images and return as base64 data URL
+    Load image from assets/images and return as base64 data URL (cached per filename)
 
     Args:
         filename: Image filename (e.g., 'lupa.png', 'logo.png')
@@ -291,19 +330,14 @@ def load_image_base64(filename: str) -> str:
         Base64 data URL string (e.g., 'data:image/png;base64,iVBORw0KG...')
         Returns empty string if file not found
     """
-    import base64
-    from pathlib import Path
-
     # Get path to assets/images directory
-    config_dir = Path(__file__).parent
-    image_path = config_dir / "assets" / "images" / filename
+    image_path = _IMAGES_DIR / filename
 
     if image_path.exists():
-        with open(image_path, "rb") as f:
-            image_data = base64.b64encode(f.read()).decode()
-            # Detect file extension for proper MIME type
-            extension = image_path.suffix.lower()
-            mime_type = "image/png" if extension == ".png" else f"image/{extension[1:]}"
-            return f'data:{mime_type};base64,{image_data}'
+        image_data = base64.b64encode(image_path.read_bytes()).decode("ascii")
+        # Detect file extension for proper MIME type
+        extension = image_path.suffix.lower()
+        mime_type = "image/png" if extension == ".png" else f"image/{extension[1:]}"
+        return f'data:{mime_type};base64,{image_data}'
 
     return ""
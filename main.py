@@ -4,94 +4,26 @@ Main entry point with sidebar navigation
 """
 
 import streamlit as st
-from config import PAGE_CONFIG, APP_TITLE, load_image_base64
+from config import PAGE_CONFIG, APP_TITLE, NAV_PAGES, NAV_PAGE_LABELS, load_image_base64
 from app_pages import home, analysis, history, about
+from app_pages._styles import inject_css
 
 
 # Configure page
 st.set_page_config(**PAGE_CONFIG)
 
-# Apply custom color scheme (medical/clinical theme)
-st.markdown("""
-    <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Material+Symbols+Rounded:opsz,wght,FILL,GRAD@20..48,100..700,0..1,-50..200" />
-
-    <style>
-        /* Sidebar styling - Medical blue-green theme */
-        [data-testid="stSidebar"] {
-            background: linear-gradient(180deg, #0d4d5e 0%, #115e70 100%);
-        }
-
-        [data-testid="stSidebar"] * {
-            color: white !important;
-        }
-
-        [data-testid="stSidebar"] .stMarkdown {
-            color: white !important;
-        }
-
-        /* Page background - Light clinical theme */
-        .main {
-            background-color: #f0f7f9;
-        }
-
-        .block-container {
-            background-color: #f0f7f9;
-        }
-
-        /* Button styling in sidebar */
-        [data-testid="stSidebar"] button {
-            background-color: rgba(255, 255, 255, 0.15) !important;
-            border: 1px solid rgba(255, 255, 255, 0.3) !important;
-            color: white !important;
-        }
-
-        [data-testid="stSidebar"] button:hover {
-            background-color: rgba(255, 255, 255, 0.25) !important;
-            border-color: rgba(255, 255, 255, 0.5) !important;
-        }
-
-        [data-testid="stSidebar"] button[kind="primary"] {
-            background-color: rgba(255, 255, 255, 0.35) !important;
-            font-weight: 600 !important;
-            border: 2px solid rgba(255, 255, 255, 0.6) !important;
-        }
-
-        [data-testid="stSidebar"] button p {
-            color: white !important;
-        }
-
-        /* Headings on main page - Medical theme colors */
-        .main h1 {
-            color: #0d4d5e !important;
-        }
-
-        .main h2 {
-            color: #115e70 !important;
-        }
-
-        .main h3 {
-            color: #15758a !important;
-        }
-    </style>
-""", unsafe_allow_html=True)
+# Apply custom color scheme (medical/clinical theme) and shared component styles
+inject_css()
 
 # Initialize current page in session state
-if 'current_page' not in st.session_state:
-    st.session_state.current_page = "Home"
+st.session_state.setdefault('current_page', "Home")
 
 # Sidebar navigation
 st.sidebar.title("Dashboard")
 st.sidebar.markdown("---")
 
 # Navigation buttons with updated names (no emojis)
-pages = {
-    "Home": "Overview",
-    "Analysis": "Assessment",
-    "History": "History",
-    "About": "About"
-}
-
-for page_key, page_label in pages.items():
+for page_key, page_label in NAV_PAGES:
     # Check if this is the current page
     is_current = st.session_state.current_page == page_key
 
@@ -119,7 +51,7 @@ else:
     logo_html = "🩺"
 
 # Get current page subtitle
-current_page_subtitle = pages.get(st.session_state.current_page, "AI-Assisted Skin Lesion Risk Assessment")
+current_page_subtitle = NAV_PAGE_LABELS.get(st.session_state.current_page, "AI-Assisted Skin Lesion Risk Assessment")
 
 st.markdown(f"""
     <div style="
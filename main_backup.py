@@ -3,7 +3,9 @@ from PIL import Image
 import base64
 from pathlib import Path
 from io import BytesIO
+from functools import lru_cache
 import json
+import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from prediction_service import create_service, PredictionResponse, ExplainResponse
@@ -11,7 +13,7 @@ from config import (
     PAGE_CONFIG, SUPPORTED_IMAGE_TYPES, LOCATION_DISPLAY_NAMES,
     AGE_MIN, AGE_MAX, AGE_DEFAULT, DIAMETER_MIN, DIAMETER_MAX,
     DIAMETER_DEFAULT, DIAMETER_STEP, SEX_OPTIONS, get_risk_color,
-    CHART_COLORS, GAUGE_CONFIG, FEATURES_PER_ROW, MODEL_INFO,
+    CHART_COLORS, GAUGE_CONFIG, MODEL_INFO,
     APP_TITLE, APP_SUBTITLE, FOOTER_HTML, ERROR_MESSAGES,
     SUCCESS_MESSAGES, API_BASE_URL, map_location_to_api
 )
@@ -27,33 +29,33 @@ def load_icon(icon_path):
         return None
 
 
+ICONS_DIR = Path(__file__).parent / "assets" / "icons"
+
+# Fallback emojis if icon file doesn't exist
+EMOJI_FALLBACKS = {
+    "location": "📍",
+    "camera": "📸",
+    "patient": "👤",
+    "analyse": "🔬",
+    "medical": "🩺",
+    "chart": "📊",
+    "upload": "📤"
+}
+
+
+@lru_cache(maxsize=32)
 def get_icon_html(icon_name, size=20):
-    """Generate HTML for custom icon with fallback to emoji"""
-    icons_dir = Path(__file__).parent / "assets" / "icons"
-    icon_path = icons_dir / f"{icon_name}.png"
-
-    # Fallback emojis if icon file doesn't exist
-    emoji_fallbacks = {
-        "location": "📍",
-        "camera": "📸",
-        "patient": "👤",
-        "analyse": "🔬",
-        "medical": "🩺",
-        "chart": "📊",
-        "upload": "📤"
-    }
-
-    icon_data = load_icon(icon_path)
+    """Generate HTML for custom icon with fallback to emoji (memoized per icon and size)"""
+    icon_data = load_icon(ICONS_DIR / f"{icon_name}.png")
     if icon_data:
         return f'<img src="{icon_data}" width="{size}" height="{size}" style="vertical-align: middle; margin-right: 8px;">'
     else:
         # Fallback to emoji
-        return emoji_fallbacks.get(icon_name, "•")
+        return EMOJI_FALLBACKS.get(icon_name, "•")
 
 
-def apply_custom_styles():
-    """Apply custom CSS styles for a modern medical app look"""
-    st.markdown("""
+# Static stylesheet, built once at import time
+CUSTOM_CSS = """
         <style>
         /* Import modern font */
         @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
@@ -151,7 +153,17 @@ def apply_custom_styles():
             margin-bottom: 1.5rem;
         }
         </style>
-    """, unsafe_allow_html=True)
+    """
+
+
+def apply_custom_styles():
+    """
+    Apply custom CSS styles for a modern medical app look
+
+    Emitted on every run: Streamlit drops elements that are not re-rendered
+    during a rerun, so the styles cannot be injected once per session.
+    """
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 
 def show_instructions():
@@ -205,6 +217,28 @@ def calculate_risk_category(probability: float) -> str:
         return "high"
 
 
+# Per-model risk card (filled with str.format)
+RISK_CARD_TMPL = """
+    <div style="
+        background: linear-gradient(135deg, {bg_color} 0%, {color}15 100%);
+        border-left: 6px solid {color};
+        border-radius: 12px;
+        padding: 1.5rem;
+        margin: 1rem 0;
+        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+    ">
+        <h3 style="color: {title_color}; margin: 0; font-size: 1.2rem;">{title}</h3>
+        <p style="color: #6b7280; font-size: 0.9rem; margin: 0.5rem 0;">{description}</p>
+        <h2 style="color: {color}; margin: 0.5rem 0 0 0; font-size: 1.8rem;">
+            {icon} {risk} RISK
+        </h2>
+        <p style="font-size: 1.5rem; color: #374151; margin: 0.5rem 0 0 0;">
+            <strong style="color: {color};">{probability:.1%}</strong>
+        </p>
+    </div>
+"""
+
+
 def display_risk_assessment(response: PredictionResponse):
     """
     Display risk assessment with color coding and visual elements for both models
@@ -240,25 +274,16 @@ def display_risk_assessment(response: PredictionResponse):
     with col1:
         color_a, bg_color_a, icon_a = get_risk_color(model_a_risk)
 
-        st.markdown(f"""
-            <div style="
-                background: linear-gradient(135deg, {bg_color_a} 0%, {color_a}15 100%);
-                border-left: 6px solid {color_a};
-                border-radius: 12px;
-                padding: 1.5rem;
-                margin: 1rem 0;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            ">
-                <h3 style="color: #1e40af; margin: 0; font-size: 1.2rem;">Image Classifier Model</h3>
-                <p style="color: #6b7280; font-size: 0.9rem; margin: 0.5rem 0;">Analyzes the uploaded image to estimate lesion risk based on visual patterns.</p>
-                <h2 style="color: {color_a}; margin: 0.5rem 0 0 0; font-size: 1.8rem;">
-                    {icon_a} {model_a_risk.upper()} RISK
-                </h2>
-                <p style="font-size: 1.5rem; color: #374151; margin: 0.5rem 0 0 0;">
-                    <strong style="color: {color_a};">{response.model_a_probability:.1%}</strong>
-                </p>
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(RISK_CARD_TMPL.format(
+            color=color_a,
+            bg_color=bg_color_a,
+            icon=icon_a,
+            title_color="#1e40af",
+            title="Image Classifier Model",
+            description="Analyzes the uploaded image to estimate lesion risk based on visual patterns.",
+            risk=model_a_risk.upper(),
+            probability=response.model_a_probability
+        ), unsafe_allow_html=True)
 
         # Gauge for Model A
         fig_a = go.Figure(go.Indicator(
@@ -298,25 +323,16 @@ def display_risk_assessment(response: PredictionResponse):
     with col2:
         color_c, bg_color_c, icon_c = get_risk_color(model_c_risk)
 
-        st.markdown(f"""
-            <div style="
-                background: linear-gradient(135deg, {bg_color_c} 0%, {color_c}15 100%);
-                border-left: 6px solid {color_c};
-                border-radius: 12px;
-                padding: 1.5rem;
-                margin: 1rem 0;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            ">
-                <h3 style="color: #15803d; margin: 0; font-size: 1.2rem;">Feature-Based Risk Model</h3>
-                <p style="color: #6b7280; font-size: 0.9rem; margin: 0.5rem 0;">Estimates lesion risk using extracted image features combined with patient data.</p>
-                <h2 style="color: {color_c}; margin: 0.5rem 0 0 0; font-size: 1.8rem;">
-                    {icon_c} {model_c_risk.upper()} RISK
-                </h2>
-                <p style="font-size: 1.5rem; color: #374151; margin: 0.5rem 0 0 0;">
-                    <strong style="color: {color_c};">{response.model_c_probability:.1%}</strong>
-                </p>
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(RISK_CARD_TMPL.format(
+            color=color_c,
+            bg_color=bg_color_c,
+            icon=icon_c,
+            title_color="#15803d",
+            title="Feature-Based Risk Model",
+            description="Estimates lesion risk using extracted image features combined with patient data.",
+            risk=model_c_risk.upper(),
+            probability=response.model_c_probability
+        ), unsafe_allow_html=True)
 
         # Gauge for Model C
         fig_c = go.Figure(go.Indicator(
@@ -428,19 +444,19 @@ def display_extracted_features(response: PredictionResponse):
             </div>
         """, unsafe_allow_html=True)
 
-        # Display features in a grid
-        num_features = len(response.extracted_features)
-
-        for i in range(0, num_features, FEATURES_PER_ROW):
-            cols = st.columns(FEATURES_PER_ROW)
-            for j, col in enumerate(cols):
-                idx = i + j
-                if idx < num_features:
-                    with col:
-                        st.metric(
-                            label=f"F{idx + 1}",
-                            value=f"{response.extracted_features[idx]:.2f}"
-                        )
+        # Display all features in a single table element
+        features = response.extracted_features
+        df_features = pd.DataFrame({
+            'Feature': [f"F{i}" for i in range(1, len(features) + 1)],
+            'Value': features
+        })
+
+        st.dataframe(
+            df_features,
+            hide_index=True,
+            use_container_width=True,
+            column_config={'Value': st.column_config.NumberColumn(format="%.2f")}
+        )
 
 
 def display_shap_explanation(explain_response: ExplainResponse):
@@ -694,10 +710,8 @@ def main():
         analyze_button = st.button(f"Analyze Lesion", use_container_width=True)
 
     # Initialize session state for results
-    if 'results_ready' not in st.session_state:
-        st.session_state.results_ready = False
-    if 'show_shap' not in st.session_state:
-        st.session_state.show_shap = False
+    st.session_state.setdefault('results_ready', False)
+    st.session_state.setdefault('show_shap', False)
 
     if analyze_button:
         if image is None:
@@ -5,7 +5,8 @@ Handles all communication with the backend API for patient and lesion management
 """
 
 import requests
-from typing import Dict, Any, List, Optional
+import streamlit as st
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from config import API_BASE_URL, API_TIMEOUT, API_ENDPOINTS
 
@@ -41,15 +42,17 @@ class Lesion:
 class PatientLesionService:
     """Service to interact with Patient and Lesion APIs"""
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, session: requests.Session = None):
         """
         Initialize the service
 
         Args:
             base_url: Base URL of the backend API (defaults to config.API_BASE_URL)
+            session: HTTP session to use (defaults to a new keep-alive session)
         """
         self.base_url = (base_url or API_BASE_URL).rstrip('/')
         self.timeout = API_TIMEOUT
+        self.session = session or requests.Session()
 
     # =============================================================================
     # PATIENT METHODS
@@ -87,7 +90,7 @@ class PatientLesionService:
         }
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 url,
                 json=payload,
                 headers={"Content-Type": "application/json"},
@@ -134,7 +137,7 @@ class PatientLesionService:
         url = f"{self.base_url}{API_ENDPOINTS['patients_search']}"
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
                 params={"name": search_term},
                 timeout=self.timeout
@@ -180,7 +183,7 @@ class PatientLesionService:
         url = f"{self.base_url}{API_ENDPOINTS['patient_by_id'].format(patient_id=patient_id)}"
 
         try:
-            response = requests.get(url, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
 
             if response.status_code == 404:
                 return None
@@ -209,6 +212,32 @@ class PatientLesionService:
         except requests.exceptions.RequestException as e:
             raise Exception(f"Connection error: {str(e)}")
 
+    def create_patient_and_lesion(
+        self,
+        patient: Dict[str, Any],
+        lesion: Dict[str, Any]
+    ) -> Tuple[Patient, Lesion]:
+        """
+        Create a new patient together with their first lesion
+
+        The backend has no combined endpoint, so this issues both POSTs back to
+        back on the service's keep-alive session. The lesion is linked to the
+        created patient's ID.
+
+        Args:
+            patient: Keyword arguments for create_patient
+            lesion: Keyword arguments for create_lesion (patient_id is filled in)
+
+        Returns:
+            Tuple of (Patient, Lesion) objects with created data
+
+        Raises:
+            Exception: If either API call fails
+        """
+        created_patient = self.create_patient(**patient)
+        created_lesion = self.create_lesion(**{**lesion, "patient_id": created_patient.patient_id})
+        return created_patient, created_lesion
+
     # =============================================================================
     # LESION METHODS
     # =============================================================================
@@ -245,7 +274,7 @@ class PatientLesionService:
         }
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 url,
                 json=payload,
                 headers={"Content-Type": "application/json"},
@@ -289,7 +318,7 @@ class PatientLesionService:
         url = f"{self.base_url}{API_ENDPOINTS['patient_lesions'].format(patient_id=patient_id)}"
 
         try:
-            response = requests.get(url, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
 
             data = response.json()
@@ -331,7 +360,7 @@ class PatientLesionService:
         url = f"{self.base_url}{API_ENDPOINTS['lesion_by_id'].format(lesion_id=lesion_id)}"
 
         try:
-            response = requests.get(url, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
 
             if response.status_code == 404:
                 return None
@@ -361,7 +390,8 @@ class PatientLesionService:
             raise Exception(f"Connection error: {str(e)}")
 
 
-# Utility function for easy import
+# Utility function for easy import (one instance per process, shared across reruns and sessions)
+@st.cache_resource(show_spinner=False)
 def create_patient_lesion_service(base_url: str = None) -> PatientLesionService:
     """
     Factory function to create a PatientLesionService instance
@@ -370,6 +400,45 @@ def create_patient_lesion_service(base_url: str = None) -> PatientLesionService:
         base_url: Base URL of the backend API (defaults to config.API_BASE_URL)
 
     Returns:
-        Configured PatientLesionService instance
+        Configured PatientLesionService instance (cached singleton per base_url)
     """
     return PatientLesionService(base_url)
+
+
+# Cached read queries (short TTL; exceptions are not cached)
+@st.cache_data(ttl=60, max_entries=128, show_spinner=False)
+def search_patients_cached(search_term: str) -> List[Patient]:
+    """
+    Search patients by name, memoized per search term for 60 seconds
+
+    Args:
+        search_term: Search string (minimum 2 characters)
+
+    Returns:
+        List of Patient objects matching the search
+    """
+    return create_patient_lesion_service().search_patients_by_name(search_term)
+
+
+@st.cache_data(ttl=60, max_entries=64, show_spinner=False)
+def get_lesions_by_patient_cached(patient_id: str) -> List[Lesion]:
+    """
+    Get all lesions for a patient, memoized per patient for 60 seconds
+
+    Args:
+        patient_id: Patient ID
+
+    Returns:
+        List of Lesion objects
+    """
+    return create_patient_lesion_service().get_lesions_by_patient(patient_id)
+
+
+def clear_patient_search_cache():
+    """Invalidate cached patient searches (call after creating a patient)"""
+    search_patients_cached.clear()
+
+
+def clear_lesions_cache():
+    """Invalidate cached lesion lists (call after creating a lesion)"""
+    get_lesions_by_patient_cached.clear()
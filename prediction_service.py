@@ -6,6 +6,7 @@ including health checks and prediction requests.
 """
 
 import requests
+import streamlit as st
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 from config import API_BASE_URL, API_TIMEOUT, VALID_ANATOMICAL_LOCATIONS
@@ -49,15 +50,17 @@ class ExplainResponse:
 class PredictionService:
     """Service to interact with the Skin Lesion AI backend API"""
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, session: requests.Session = None):
         """
         Initialize the prediction service
 
         Args:
             base_url: Base URL of the backend API (defaults to config.API_BASE_URL)
+            session: HTTP session to use (defaults to a new keep-alive session)
         """
         self.base_url = (base_url or API_BASE_URL).rstrip('/')
         self.timeout = API_TIMEOUT
+        self.session = session or requests.Session()
 
     def check_health(self) -> Dict[str, str]:
         """
@@ -70,7 +73,7 @@ class PredictionService:
             requests.exceptions.RequestException: If connection fails
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/health",
                 timeout=self.timeout
             )
@@ -90,7 +93,7 @@ class PredictionService:
             requests.exceptions.RequestException: If connection fails
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/",
                 timeout=self.timeout
             )
@@ -165,7 +168,7 @@ class PredictionService:
         }
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/predict",
                 files=files,
                 data=data,
@@ -218,7 +221,7 @@ class PredictionService:
             raise ValueError("analysis_id is required")
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/explain/{analysis_id}",
                 timeout=self.timeout
             )
@@ -272,14 +275,15 @@ class PredictionService:
 
         if location.lower() not in VALID_ANATOMICAL_LOCATIONS:
             raise ValueError(
-                f"Location must be one of {VALID_ANATOMICAL_LOCATIONS}, got {location}"
+                f"Location must be one of {sorted(VALID_ANATOMICAL_LOCATIONS)}, got {location}"
             )
 
         if diameter <= 0:
             raise ValueError(f"Diameter must be positive, got {diameter}")
 
 
-# Utility function for easy import
+# Utility function for easy import (one instance per process, shared across reruns and sessions)
+@st.cache_resource(show_spinner=False)
 def create_service(base_url: str = None) -> PredictionService:
     """
     Factory function to create a PredictionService instance
@@ -288,6 +292,23 @@ def create_service(base_url: str = None) -> PredictionService:
         base_url: Base URL of the backend API (defaults to config.API_BASE_URL)
 
     Returns:
-        Configured PredictionService instance
+        Configured PredictionService instance (cached singleton per base_url)
     """
     return PredictionService(base_url)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def get_explanation_cached(analysis_id: str) -> ExplainResponse:
+    """
+    Get the SHAP explanation for an analysis, memoized per analysis_id
+
+    An analysis never changes once stored, so its explanation can be reused
+    every time the user re-opens the Feature Contribution section.
+
+    Args:
+        analysis_id: Unique analysis ID returned by /api/predict
+
+    Returns:
+        ExplainResponse object with SHAP values
+    """
+    return create_service().get_explanation(analysis_id=analysis_id)
@@ -4,8 +4,9 @@ Validation Utilities
 Provides validation functions for patient and lesion data.
 """
 
-from datetime import datetime
-from typing import Tuple
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Tuple
 import sys
 from pathlib import Path
 
@@ -108,7 +109,7 @@ def validate_lesion_location(location: str) -> Tuple[bool, str]:
         return False, "Lesion location is required"
 
     if location.lower() not in VALID_ANATOMICAL_LOCATIONS:
-        return False, f"Invalid location. Must be one of: {', '.join(VALID_ANATOMICAL_LOCATIONS)}"
+        return False, f"Invalid location. Must be one of: {', '.join(sorted(VALID_ANATOMICAL_LOCATIONS))}"
 
     return True, ""
 
@@ -155,6 +156,51 @@ def validate_current_lesion_size(size_mm: float) -> Tuple[bool, str]:
     return True, ""
 
 
+def validate_patient(full_name: str, date_of_birth: str, sex: str) -> List[str]:
+    """
+    Validate all patient fields in one call
+
+    Args:
+        full_name: Patient full name
+        date_of_birth: Date string in DD/MM/YYYY format
+        sex: Patient sex value
+
+    Returns:
+        List of error messages (empty if all fields are valid)
+    """
+    results = (
+        validate_patient_name(full_name),
+        validate_date_of_birth(date_of_birth),
+        validate_sex(sex)
+    )
+    return [error for is_valid, error in results if not is_valid]
+
+
+def validate_lesion(location: str, initial_size_mm: float) -> List[str]:
+    """
+    Validate all lesion fields in one call
+
+    Args:
+        location: Lesion location (API format)
+        initial_size_mm: Initial lesion diameter in millimeters
+
+    Returns:
+        List of error messages (empty if all fields are valid)
+    """
+    results = (
+        validate_lesion_location(location),
+        validate_initial_lesion_size(initial_size_mm)
+    )
+    return [error for is_valid, error in results if not is_valid]
+
+
+@lru_cache(maxsize=1024)
+def _age_on(date_of_birth: str, today_ordinal: int) -> int:
+    """Age in years on the given day (memoized per date of birth and day)"""
+    birth_date = datetime.strptime(date_of_birth, DATE_FORMAT_PYTHON).date()
+    return int((date.fromordinal(today_ordinal) - birth_date).days / 365.25)
+
+
 def calculate_age_from_dob(date_of_birth: str) -> int:
     """
     Calculate current age from date of birth
@@ -169,8 +215,7 @@ def calculate_age_from_dob(date_of_birth: str) -> int:
         ValueError: If date format is invalid
     """
     try:
-        birth_date = datetime.strptime(date_of_birth, DATE_FORMAT_PYTHON)
-        age_years = int((datetime.now() - birth_date).days / 365.25)
-        return age_years
+        # Keyed by today's date so cached ages roll over at midnight
+        return _age_on(date_of_birth, date.today().toordinal())
     except ValueError as e:
         raise ValueError(f"Invalid date format: {e}")